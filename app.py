@@ -1,14 +1,19 @@
-from sklearn.linear_model import LinearRegression
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from concurrent.futures import as_completed
 from datetime import datetime
-from fpdf import FPDF
-import plotly.graph_objects as go
-from statsmodels.tsa.arima.model import ARIMA
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-import numpy as np
+
+from dashboard import graph
+from dashboard.backends import get_backend
+from dashboard.backtest import INTERVAL, quality
+from dashboard.export import EXPORT_FORMATS, export_orders
+from dashboard.filters import FILTER_COLUMNS, Filters, filter_index
+from dashboard.forecasting import enabled_backends
+from dashboard.ingest import ingest_orders, last_ingest
+from dashboard.metrics import record_session, span
+from dashboard.segments import SEGMENT_MODELS
+from dashboard.kpis import REVENUE_MODELS
+from dashboard.reports import SCOPE_LABELS, render_report
 
 
 st.markdown("""
@@ -38,112 +43,95 @@ box_style = """
     justify-content: center;
 """
 
-# === Load Data ===
-df = pd.read_csv("Auto Sales data Cleaned.csv", parse_dates=["ORDERDATE"])
-df.columns = df.columns.str.strip()
-df["ORDERDATE"] = pd.to_datetime(df["ORDERDATE"])
-df["EST_PROFIT"] = (df["MSRP"] - df["PRICEEACH"]) * df["QUANTITYORDERED"]
-df["MONTH"] = df["ORDERDATE"].dt.to_period("M")
-
-# === KPI Calculations ===
-total_revenue = df["SALES"].sum()
-latest_month = df["ORDERDATE"].max().to_period("M")
-latest_month_revenue = df[df["ORDERDATE"].dt.to_period("M") == latest_month]["SALES"].sum()
-
-last_3_months = df["MONTH"].sort_values().unique()[-3:]
-rev_last_3 = df[df["MONTH"].isin(last_3_months)].groupby("MONTH")["SALES"].sum()
-growth_rate = ((rev_last_3.iloc[-1] - rev_last_3.iloc[0]) / rev_last_3.iloc[0]) * 100 if len(rev_last_3) == 3 else 0
-
-monthly_rev = df.groupby(df["ORDERDATE"].dt.to_period("M"))["SALES"].sum()
-
-# === ARIMA Model for Forecasting ===
-def arima_forecast(monthly_rev):
-    model = ARIMA(monthly_rev, order=(1,1,1))
-    model_fit = model.fit()
-    forecast = model_fit.forecast(steps=1)
-    return forecast[0]
-
-next_month_prediction_arima = arima_forecast(monthly_rev)
-predicted_month_name = (latest_month.to_timestamp() + pd.DateOffset(months=1)).strftime('%B')
-
-# === LSTM Model for Forecasting ===
-def lstm_forecast(monthly_rev):
-    # Preparing the data for LSTM model
-    X = np.array(monthly_rev.values[:-1]).reshape(-1, 1)
-    y = np.array(monthly_rev.values[1:])
+# === Performance Debug (opt-in: spans are only recorded while the panel is on) ===
+with st.sidebar:
+    show_metrics = st.toggle("🐞 Performance debug")
+    metrics_panel = st.empty()
+session_spans = record_session(show_metrics)
+
+# === Data Backend (pandas in memory, or chunked / duckdb for out-of-core data) ===
+data_backend = get_backend()
+
+# === Ingest New Orders (appended to the dataset without a full reload) ===
+with st.sidebar, span("section.ingest"):
+    st.markdown("### 📥 Ingest New Orders")
+    delta_file = st.file_uploader("Delta CSV (same columns as the main file)", type="csv",
+                                  disabled=data_backend.name != "pandas")
+    if delta_file is not None:
+        ingest_result = ingest_orders(delta_file)
+        if ingest_result.skipped:
+            st.info(f"{delta_file.name} was already ingested.")
+        else:
+            st.success(f"Ingested {ingest_result.rows:,} rows ({', '.join(ingest_result.months)}) "
+                       f"in {ingest_result.seconds:.2f}s")
+    latest_ingest = last_ingest()
+    if latest_ingest is not None:
+        st.caption(f"Last ingest: {latest_ingest['rows']:,} rows in {latest_ingest['seconds']:.2f}s "
+                   f"({datetime.fromtimestamp(latest_ingest['at']).strftime('%Y-%m-%d %H:%M')})")
+
+# === Filters (answered from an index built once per data version) ===
+with st.sidebar, span("section.filters"):
+    st.markdown("### 🔎 Filters")
+    order_index = filter_index(data_backend)
+    first_day, last_day = order_index.date_bounds()
+    date_range = st.date_input("Order date", value=(first_day, last_day),
+                               min_value=first_day, max_value=last_day)
+    filter_labels = {"productlines": "Product line", "customers": "Customer", "categories": "Purchase category"}
+    selected = {
+        field: tuple(st.multiselect(filter_labels[field], order_index.values(column), placeholder="All"))
+        for field, column in FILTER_COLUMNS.items()
+    }
+# A half-picked range (start only) filters from that day on
+start = date_range[0] if len(date_range) > 0 and date_range[0] > first_day else None
+end = date_range[1] if len(date_range) > 1 and date_range[1] < last_day else None
+filters = Filters(start=start, end=end, **selected)
 
-    # Reshaping for LSTM input (samples, time steps, features)
-    X = X.reshape((X.shape[0], 1, X.shape[1]))
+# === Computation Graph (memoized nodes shared by all sessions, see dashboard.graph) ===
+run = {"backend": data_backend.name, "path": str(data_backend.path), "version": data_backend.version(),
+       "filters": filters}
 
-    # Build the LSTM model
-    model = Sequential()
-    model.add(LSTM(50, activation='relu', input_shape=(X.shape[1], X.shape[2])))
-    model.add(Dense(1))
-    model.compile(optimizer='adam', loss='mean_squared_error')
+# Panels whose results are still computing in the pool: during a full run they
+# are filled in at the end, so the page renders first; a fragment rerun waits in place
+deferred = []
 
-    # Fit the model
-    model.fit(X, y, epochs=200, batch_size=32)
 
-    # Predict the next month
-    prediction = model.predict(X[-1].reshape(1, 1, 1))
-    return prediction[0, 0]
+def when_ready(fill):
+    if deferred is None:
+        fill()
+    else:
+        deferred.append(fill)
 
-next_month_prediction_lstm = lstm_forecast(monthly_rev)
 
-from fpdf import FPDF
-from datetime import datetime
+# === KPI Snapshot (from `python -m dashboard snapshot`, or computed once per data version and filter) ===
+snapshot = graph.snapshot(run)
+if snapshot is None:
+    st.warning("No orders match the selected filters.")
+    st.stop()
+last_3_months = [pd.Period(month, "M") for month in snapshot["months"]]
 
-# Function to generate the PDF report
-def generate_pdf(total_revenue, latest_month, latest_month_revenue, growth_rate, predicted_month_name, 
-                 next_month_prediction_arima, next_month_prediction_lstm, shipped, not_shipped):
-    
-    # Initialize the PDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Add the title
-    pdf.cell(200, 10, txt="KPI Summary Report", ln=True, align='C')
-    pdf.ln(10)
-    
-    # Add the revenue and prediction details
-    pdf.cell(200, 10, txt=f"Overall Revenue: £{total_revenue:,.0f}", ln=True)
-    pdf.cell(200, 10, txt=f"Latest Month Revenue ({latest_month.strftime('%B')}): £{latest_month_revenue:,.0f}", ln=True)
-    pdf.cell(200, 10, txt=f"3-Month Growth Rate: {growth_rate:.2f}%", ln=True)
-    pdf.cell(200, 10, txt=f"Predicted Revenue ({predicted_month_name} - ARIMA): £{next_month_prediction_arima:,.0f}", ln=True)
-    pdf.cell(200, 10, txt=f"Predicted Revenue ({predicted_month_name} - LSTM): £{next_month_prediction_lstm:,.0f}", ln=True)
-    
-    # Check if 'shipped' is a valid number and default it if it's not
-    if not isinstance(shipped, (int, float)):
-        shipped = 0  # Default value if 'shipped' is not a valid number
-    
-    if not isinstance(not_shipped, (int, float)):
-        not_shipped = 0  # Default value if 'not_shipped' is not a valid number
-    
-    # Add the orders shipped and not shipped information to the PDF
-    pdf.cell(200, 10, txt=f"Orders Shipped: {shipped:,}", ln=True)
-    pdf.cell(200, 10, txt=f"Orders Not Shipped: {not_shipped:,}", ln=True)
-    
-    # Output the PDF as a byte object
-    return pdf.output(dest='S').encode('latin-1')
-
-# Example of calling the function with sample data
-total_revenue = 1000000
-latest_month = datetime(2025, 7, 1)  # Example month
-latest_month_revenue = 120000
-growth_rate = 5.2  # Example growth rate
-predicted_month_name = 'August'
-next_month_prediction_arima = 125000
-next_month_prediction_lstm = 130000
-shipped = 80000  # Example number of orders shipped
-not_shipped = 20000  # Example number of orders not shipped
-
-# Generate the PDF
-pdf_bytes = generate_pdf(total_revenue, latest_month, latest_month_revenue, growth_rate, 
-                         predicted_month_name, next_month_prediction_arima, next_month_prediction_lstm, 
-                         shipped, not_shipped)
-
-# You can now use pdf_bytes for further processing (e.g., saving or sending the PDF)
+# === KPI Calculations ===
+kpis = snapshot["kpis"]
+total_revenue = kpis["total_revenue"]
+latest_month = pd.Period(kpis["latest_month"], "M")
+latest_month_revenue = kpis["latest_month_revenue"]
+growth_rate = kpis["growth_rate"]
+predicted_month_name = pd.Period(kpis["predicted_month"], "M").strftime('%B')
+shipped = snapshot["orders"]["shipped"]
+not_shipped = snapshot["orders"]["not_shipped"]
+
+# === ARIMA & LSTM Forecasts (from the snapshot, else run in the background process pool) ===
+revenue_forecasts = graph.revenue_forecasts(run)
+
+# Render the PDF once the forecasts are in (only when the download is clicked;
+# the file is reused by every session until the numbers change)
+def build_pdf_bytes():
+    predictions = {}
+    for model, future in revenue_forecasts.items():
+        try:
+            predictions[model] = future.result()
+        except Exception:
+            predictions[model] = None
+    return render_report({**snapshot, "forecasts": predictions}).read_bytes()
 
 
 # === Header ===
@@ -158,7 +146,26 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-st.download_button("Download KPI Summary PDF", data=pdf_bytes, file_name="KPI_Summary_Report.pdf", mime="application/pdf")
+st.download_button("Download KPI Summary PDF", data=build_pdf_bytes, file_name="KPI_Summary_Report.pdf", mime="application/pdf")
+
+
+@st.fragment
+def scoped_reports_panel():
+    report_scope = st.radio("Report per", list(snapshot["scopes"]), format_func=SCOPE_LABELS.get, horizontal=True,
+                            key="report_scope")
+    report_value = st.selectbox(SCOPE_LABELS[report_scope], snapshot["scopes"][report_scope])
+
+    # Rendered on click and cached by snapshot hash; `python -m dashboard reports` pre-renders them all
+    def build_scoped_pdf_bytes():
+        scoped = graph.scoped_snapshots({**run, "scope": report_scope})
+        return render_report(scoped[report_value]).read_bytes()
+
+    st.download_button("Download Report", data=build_scoped_pdf_bytes,
+                       file_name=f"KPI_Report_{report_value.replace('/', '-')}.pdf", mime="application/pdf")
+
+
+with st.expander("📑 Scoped KPI Reports"):
+    scoped_reports_panel()
 st.markdown("### 📊 Key Performance Indicators")
 
 # === KPI Cards ===
@@ -172,27 +179,26 @@ with top_cols[2]:
 
 bottom_cols = st.columns(3)
 
-# 🔮 Predicted Revenue (ARIMA)
-with bottom_cols[0]:
-    st.markdown(f"""
+def forecast_card_html(model, value=None):
+    if model not in revenue_forecasts:
+        figure = "Disabled"
+    else:
+        figure = "⏳ Forecasting…" if value is None else f"£{value:,.0f}"
+    return f"""
     <div style='{box_wrapper}'>
         <div style='{box_style}'>
-            <h5>🔮 Predicted Revenue ({predicted_month_name} - ARIMA)</h5>
-            <h3>£{next_month_prediction_arima:,.0f}</h3>
+            <h5>🔮 Predicted Revenue ({predicted_month_name} - {model})</h5>
+            <h3>{figure}</h3>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
 
-# 🔮 Predicted Revenue (LSTM)
-with bottom_cols[1]:
-    st.markdown(f"""
-    <div style='{box_wrapper}'>
-        <div style='{box_style}'>
-            <h5>🔮 Predicted Revenue ({predicted_month_name} - LSTM)</h5>
-            <h3>£{next_month_prediction_lstm:,.0f}</h3>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+# 🔮 Predicted Revenue (ARIMA / LSTM): placeholders, filled in as each job finishes
+forecast_cards = {}
+for col, model in zip(bottom_cols[:2], REVENUE_MODELS):
+    with col:
+        forecast_cards[model] = st.empty()
+        forecast_cards[model].markdown(forecast_card_html(model), unsafe_allow_html=True)
 
 # 📦 Orders Status + Accuracy
 with bottom_cols[2]:
@@ -213,59 +219,46 @@ with bottom_cols[2]:
     """
     st.markdown(combined_orders_html, unsafe_allow_html=True)
 
-# 📊 Dashboard Accuracy & Confidence (separate box)
-with bottom_cols[2]:
-    st.markdown(f"""
+# 📊 Dashboard Accuracy & Confidence (separate box), from the rolling-origin backtest
+def quality_card_html(result=None):
+    if result is None:
+        accuracy, confidence = "⏳ Backtesting…", "⏳"
+    else:
+        headline = quality(result)
+        if headline is None:
+            accuracy, confidence = "n/a", "n/a"
+        else:
+            accuracy = f"{headline['accuracy']:.1f}% ({headline['model'].upper()}, {len(result['months'])} folds)"
+            coverage = "" if headline["coverage"] is None else f" ({headline['coverage']:.0%} in {INTERVAL:.0%} interval)"
+            confidence = headline["confidence"] + coverage
+    return f"""
     <div style='{box_wrapper}'>
         <div style='{box_style}'>
             <h5>📊 Dashboard Quality</h5>
             <div style='text-align: left; font-size: 14px; line-height: 1.6;'>
-                🎯 <strong>Accuracy:</strong> 93.7%<br>
-                🔐 <strong>Confidence Level:</strong> High
+                🎯 <strong>Accuracy:</strong> {accuracy}<br>
+                🔐 <strong>Confidence Level:</strong> {confidence}
             </div>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+with bottom_cols[2]:
+    quality_card = st.empty()
+    quality_card.markdown(quality_card_html(), unsafe_allow_html=True)
 
 # === Left Column for Profit and Inventory ===
 left_col_1, right_col_1 = st.columns(2)
 
-with left_col_1:
+with left_col_1, span("section.profit_walk"):
     st.markdown("#### 💵 Gross & Net Profit Analysis (Last 3 Months)")
 
-    # Calculate Profit Metrics
-    df["TOTAL_COST"] = df["RAW_MATERIAL_COST"] + df["OPERATING_EXPENSES"]
-    df["GROSS_PROFIT"] = df["SALES"] - df["RAW_MATERIAL_COST"]
-    df["NET_PROFIT"] = df["SALES"] - df["TOTAL_COST"]
-
-    recent_3_months = df[df["MONTH"].isin(last_3_months)].copy()
-    monthly_summary = recent_3_months.groupby("MONTH").agg({
-        "SALES": "sum",
-        "GROSS_PROFIT": "sum",
-        "NET_PROFIT": "sum"
-    }).reset_index()
-
-    # Waterfall Chart
-    x_vals = monthly_summary["MONTH"].apply(lambda x: str(x)).tolist()
-    y_vals = monthly_summary["NET_PROFIT"].tolist()
+    # Profit metrics come precomputed in the KPI snapshot
+    monthly_summary = pd.DataFrame(snapshot["profit_walk"])
 
+    # Waterfall Chart (built once per data version and filter state)
     st.markdown("#### 📉 Net Profit Walk (Last 3 Months)")
-    waterfall_fig = go.Figure(go.Waterfall(
-        name="Net Profit",
-        orientation="v",
-        x=x_vals,
-        y=y_vals,
-        text=[f"£{val:,.0f}" for val in y_vals],
-        textposition="outside",
-        connector={"line": {"color": "gray"}},
-    ))
-    waterfall_fig.update_layout(
-        yaxis_title="Net Profit (£)",
-        title="",
-        waterfallgap=0.3,
-        margin=dict(t=30, b=30)
-    )
-    st.plotly_chart(waterfall_fig, use_container_width=True)
+    st.plotly_chart(graph.waterfall(run), use_container_width=True)
 
     # Add Gross & Net Profit Summary Table
     monthly_summary["Sales (£)"] = monthly_summary["SALES"].apply(lambda x: f"£{x:,.0f}")
@@ -277,296 +270,174 @@ with left_col_1:
         use_container_width=True
     )
 
-# === Check if 'GROSS_PROFIT' exists in monthly_summary ===
-if "GROSS_PROFIT" not in monthly_summary.columns:
-    st.error("Missing 'GROSS_PROFIT' column in monthly summary")
-    # Calculate GROSS_PROFIT if SALES and RAW_MATERIAL_COST are available
-    if "SALES" in monthly_summary.columns and "RAW_MATERIAL_COST" in monthly_summary.columns:
-        monthly_summary["GROSS_PROFIT"] = monthly_summary["SALES"] - monthly_summary["RAW_MATERIAL_COST"]
-    else:
-        st.error("Cannot calculate 'GROSS_PROFIT'. Missing necessary columns.")
-        st.stop()  # Stop execution if needed columns are missing
-
-# ARIMA Forecast for Gross Profit
-def arima_forecast_profit(profit_series: pd.Series):
-    """Forecast the next month's gross profit using ARIMA."""
-    # Clean the data (ensure it's numeric and drop NaN values)
-    profit_series = pd.to_numeric(profit_series, errors="coerce").dropna()
-    
-    if len(profit_series) < 3:
-        st.warning("Not enough data for ARIMA forecast.")
-        return None
-
-    # ARIMA Model
-    model = ARIMA(profit_series, order=(1, 1, 1))
-    model_fit = model.fit()
-    
-    forecast = model_fit.forecast(steps=1)
-    
-    # Debugging the forecast output
-    st.write(f"ARIMA forecast output: {forecast}")
-    
-    if len(forecast) > 0:
-        return float(forecast[0])
-    else:
-        st.error("ARIMA forecast returned an empty result.")
-        return None
-
-
-# LSTM Forecast for Gross Profit (Net Profit can also be handled similarly)
-def lstm_forecast_profit(profit_data):
-    """Forecast the next month's net profit using LSTM."""
-    # Clean the data (ensure it's numeric and drop NaN values)
-    profit_data = pd.to_numeric(profit_data, errors="coerce").dropna()
-
-    if len(profit_data) < 3:
-        st.warning("Not enough data for LSTM forecast.")
-        return None
+# === Inventory & Fulfillment (ARIMA forecasts per product line, filled in as the fits finish) ===
+# The linear trend is a batched closed-form fit, so it needs no forecaster backend
+segment_models = [model for model in SEGMENT_MODELS if model == "linear" or model in enabled_backends()]
+inventory_params = {**run, "by": "PRODUCTLINE", "measure": "QUANTITYORDERED", "model": segment_models[0]}
+inventory_forecasts = graph.segment_forecasts(inventory_params)
 
-    # Prepare the data for LSTM (use past values to predict the next value)
-    X = np.array(profit_data.values[:-1]).reshape(-1, 1)
-    y = np.array(profit_data.values[1:])
-    X = X.reshape((X.shape[0], 1, X.shape[1]))  # Reshape for LSTM (samples, timesteps, features)
+with right_col_1, span("section.inventory"):
+    st.markdown("#### 📦 Inventory & Fulfillment Summary")
 
-    # Build and train the LSTM model
-    model = Sequential()
-    model.add(LSTM(50, activation='relu', input_shape=(X.shape[1], X.shape[2])))
-    model.add(Dense(1))
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    model.fit(X, y, epochs=200, batch_size=32, verbose=0)
-
-    # Predict the next month's net profit using the last value from the data
-    prediction = model.predict(X[-1].reshape(1, 1, 1))
-    return prediction[0, 0]
+    # Inventory risk data
+    recent_lines = pd.DataFrame(snapshot["inventory"])
+    inventory_risk = recent_lines.head(5).copy()
+    inventory_risk["Stock Risk"] = inventory_risk["AT_RISK"].map({True: "⚠️ At Risk", False: "✅ Stable"})
+    inventory_risk["Sales (£)"] = inventory_risk["SALES"].apply(lambda x: f"£{x:,.0f}")
 
+    st.markdown("##### ❌ Inventory Stock Risk (Last 3 Months)")
+    st.dataframe(
+        inventory_risk[["PRODUCTLINE", "Sales (£)", "Stock Risk"]].rename(columns={"PRODUCTLINE": "Product Line"}),
+        use_container_width=True
+    )
 
-# Main Application
-def app():
-    # === ARIMA Forecast for Gross Profit ===
-    next_month_gross_profit_arima = arima_forecast_profit(monthly_summary["GROSS_PROFIT"])
+    st.markdown("##### 🔮 Predicted Inventory Movement (Next Month)")
+    inventory_chart = st.empty()
+    inventory_chart.info("⏳ Forecasting units per product line…")
 
-    # === Display ARIMA Prediction Result ===
-    if next_month_gross_profit_arima is not None:
-        st.markdown(f"**Gross Profit Prediction (ARIMA):** £{next_month_gross_profit_arima:,.0f}")
-    else:
-        st.markdown("**Gross Profit Prediction (ARIMA):** Not enough data to forecast.")
-    
-    # === LSTM Model for Net Profit Prediction ===
-    next_month_net_profit_lstm = lstm_forecast_profit(monthly_summary["GROSS_PROFIT"])
-
-    # === Display LSTM Prediction Result ===
-    if next_month_net_profit_lstm is not None:
-        st.markdown(f"**Net Profit Prediction (LSTM):** £{next_month_net_profit_lstm:,.0f}")
-    else:
-        st.markdown("**Net Profit Prediction (LSTM):** Not enough data to forecast.")
 
-    with right_col_1:
-        st.markdown("#### 📦 Inventory & Fulfillment Summary")
+def render_inventory_forecast():
+    inventory_chart.plotly_chart(graph.inventory_bars(inventory_params), use_container_width=True)
 
-        # Inventory risk data
-        stock_df = df[df["MONTH"].isin(last_3_months)].copy()
-        inventory_risk = stock_df.groupby("PRODUCTLINE")["SALES"].sum().sort_values().head(5).reset_index()
-        inventory_risk["Stock Risk"] = inventory_risk["SALES"].apply(lambda x: "⚠️ At Risk" if x < 10000 else "✅ Stable")
-        inventory_risk["Sales (£)"] = inventory_risk["SALES"].apply(lambda x: f"£{x:,.0f}")
 
-        st.markdown("##### ❌ Inventory Stock Risk (Last 3 Months)")
-        st.dataframe(
-            inventory_risk[["PRODUCTLINE", "Sales (£)", "Stock Risk"]].rename(columns={"PRODUCTLINE": "Product Line"}),
-            use_container_width=True
-        )
+when_ready(render_inventory_forecast)
 
-        st.markdown("##### 🔮 Predicted Inventory Movement (Next Month)")
-        forecast_df = df[df["MONTH"].isin(last_3_months)]
-        forecast_summary = forecast_df.groupby("PRODUCTLINE")["QUANTITYORDERED"].mean().reset_index()
-        forecast_summary["Predicted Orders"] = forecast_summary["QUANTITYORDERED"].apply(lambda x: int(x))
-
-        fig_inventory = px.bar(
-            forecast_summary.sort_values("Predicted Orders", ascending=False).head(5),
-            x="PRODUCTLINE",
-            y="Predicted Orders",
-            title="Next Month Forecast: Top 5 Product Lines (by Orders)",
-            text="Predicted Orders"
-        )
-        fig_inventory.update_traces(texttemplate='%{text}', hovertemplate='Product Line: %{x}<br>Orders: %{y}')
-        fig_inventory.update_layout(xaxis_title="Product Line", yaxis_title="Forecasted Orders")
-        st.plotly_chart(fig_inventory, use_container_width=True)
-
-    # === Insights Section ===
-    st.markdown("### 🔍 Insights on Net Profit Walk")
-    insights = [
-        "📈 Strong profit recovery in the final month suggests improved cost control or revenue boost.",
-        "💸 Mid-period dip likely due to elevated operating expenses or lower sales.",
-        "🧮 Consistent cash flow with actionable patterns for forecasting future months."
-    ]
-    for point in insights:
-        st.markdown(f"- {point}")
-
-    insight_col1, insight_col2 = st.columns(2)
-    recent_3_months = df[df["MONTH"].isin(last_3_months)].copy()
-
-    with insight_col1:
-        st.markdown("#### ❌ Lowest-Selling Product Line & Clients")
-        lowest_line = recent_3_months.groupby("PRODUCTLINE")["SALES"].sum().sort_values().head(1).reset_index()
-        low_product_line = lowest_line.iloc[0]["PRODUCTLINE"]
-        low_customers = recent_3_months[recent_3_months["PRODUCTLINE"] == low_product_line].groupby("CUSTOMERNAME")["SALES"].sum().reset_index()
-        low_customers["Sales (£)"] = low_customers["SALES"].apply(lambda x: f"£{x:,.0f}")
-        st.write(f"📉 Lowest Product Line: **{low_product_line}**")
-        st.dataframe(low_customers[["CUSTOMERNAME", "Sales (£)"]].rename(columns={"CUSTOMERNAME": "Customer"}), use_container_width=True)
-
-    with insight_col2:
-        st.markdown("#### 🔮 Forecast: Next Month Sales (Top Product Lines)")
-        top_3_productlines = df.groupby("PRODUCTLINE")["SALES"].sum().sort_values(ascending=False).head(3).reset_index()
-        forecasted_productline = df[df["PRODUCTLINE"].isin(top_3_productlines["PRODUCTLINE"])]
-        productline_forecast = forecasted_productline.groupby("PRODUCTLINE")["SALES"].mean().reset_index()
-        productline_forecast["Predicted Sales"] = productline_forecast["SALES"]
-        fig_forecast_pie = px.pie(
-            productline_forecast,
-            values="Predicted Sales",
-            names="PRODUCTLINE",
-            title="Next Month Forecast (Top 3 Product Lines)",
-            hole=0.3
-        )
-        fig_forecast_pie.update_traces(textinfo='percent+label', hovertemplate='Product Line: %{label}<br>£%{value:,.0f}')
-        st.plotly_chart(fig_forecast_pie, use_container_width=True)
 
 left_col_2, right_col_2 = st.columns(2)
 
-   # === Right Column for Cash Burn and Client Sales ===
-with right_col_2:
+# === Left Column for Next Month Sales per Product Line (or Customer) ===
+@st.fragment
+def sales_forecast_panel():
+    st.markdown("#### 🔮 Forecast: Next Month Sales")
+    segment_by = st.radio("Forecast per", ["PRODUCTLINE", "CUSTOMERNAME"], horizontal=True,
+                          format_func={"PRODUCTLINE": "Product Line", "CUSTOMERNAME": "Customer"}.get,
+                          key="segment_by")
+    segment_model = st.radio("Model", segment_models, horizontal=True, format_func=str.upper, key="segment_model")
+    label = {"PRODUCTLINE": "Product Line", "CUSTOMERNAME": "Customer"}[segment_by]
+    params = {**run, "by": segment_by, "measure": "SALES", "model": segment_model, "label": label}
+    sales_forecasts = graph.segment_forecasts(params)
+    segment_panel = st.empty()
+    segment_panel.info(f"⏳ Forecasting {len(sales_forecasts.series)} series…")
+
+    def render_sales_forecast():
+        forecasts = graph.segment_table(params).sort_values("FORECAST", ascending=False)
+        with segment_panel.container():
+            st.plotly_chart(graph.forecast_pie(params), use_container_width=True)
+
+            table = forecasts[[segment_by, "LAST", "FORECAST", "MODEL", "STATUS"]].rename(columns={
+                segment_by: label, "LAST": "Latest Month (£)", "FORECAST": "Next Month (£)",
+                "MODEL": "Model", "STATUS": "Status",
+            })
+            st.dataframe(table, use_container_width=True, hide_index=True, column_config={
+                "Latest Month (£)": st.column_config.NumberColumn(format="£%.0f"),
+                "Next Month (£)": st.column_config.NumberColumn(format="£%.0f"),
+            })
+
+    when_ready(render_sales_forecast)
+
+
+with left_col_2, span("section.segment_forecasts"):
+    sales_forecast_panel()
+
+
+# === Right Column for Cash Burn and Client Sales ===
+@st.fragment
+def cash_burn_panel():
     st.markdown("#### 💸 Cash Burn Analysis (Last 3 Months)")
 
-    if "PURCHASE_CATEGORY" in df.columns and "OPERATING_EXPENSES" in df.columns:
-        # Data Preprocessing for Cash Burn Analysis
-        recent_purchases = df[
-            df["MONTH"].isin(last_3_months) & df["PURCHASE_CATEGORY"].notnull()
-        ].copy()
-        recent_purchases = recent_purchases.rename(
-            columns={"OPERATING_EXPENSES": "CASH_BURN"}
-        )
-
-# ML Model: Linear Regression for Predicting Future Cash Burn
-def linear_regression_forecast(cash_burn_data):
-    X = np.array(range(len(cash_burn_data))).reshape(-1, 1)
-    y = np.array(cash_burn_data.values)
-
-    model = LinearRegression()
-    model.fit(X, y)
-    future_month = np.array([[len(cash_burn_data)]])  # Predicting the next month
-    forecast = model.predict(future_month)
-    return forecast[0]
-
-# Forecast for Next Month's Cash Burn
-forecast_cash_burn = linear_regression_forecast(recent_purchases["CASH_BURN"])
-st.markdown(f"**Cash Burn Forecast for Next Month:** £{forecast_cash_burn:,.0f}")
-
-# Display Cash Burn Visualization
-recent_purchases["MONTH"] = recent_purchases["MONTH"].astype(str)
-recent_purchases["CASH_BURN"] = pd.to_numeric(recent_purchases["CASH_BURN"], errors="coerce")
-fig_cash_burn = px.line(recent_purchases, x="MONTH", y="CASH_BURN", title="Cash Burn (Last 3 Months)")
-st.plotly_chart(fig_cash_burn, use_container_width=True)
-
-# Predict next month's cash burn for top 3 categories
-top_3_categories = (
-    recent_purchases.groupby("PURCHASE_CATEGORY")["CASH_BURN"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(3)
-    .reset_index()
-)
-
-# Predict Cash Burn for the Next Month (Linear Regression)
-for category in top_3_categories["PURCHASE_CATEGORY"]:
-    category_data = recent_purchases[recent_purchases["PURCHASE_CATEGORY"] == category]
-    next_month_cash_burn = linear_regression_forecast(category_data["CASH_BURN"])
-    top_3_categories.loc[top_3_categories["PURCHASE_CATEGORY"] == category, "Next Month Prediction (£)"] = f"£{next_month_cash_burn:,.0f}"
-
-# Show Top 3 Categories with Predicted Cash Burn for Next Month
-top_3_categories["Total (£)"] = top_3_categories["CASH_BURN"].apply(lambda x: f"£{x:,.0f}")
-top_3_categories["Predicted Next Month (£)"] = top_3_categories["Next Month Prediction (£)"]
-
-st.dataframe(
-    top_3_categories[["PURCHASE_CATEGORY", "Total (£)", "Predicted Next Month (£)"]]
-    .rename(columns={"PURCHASE_CATEGORY": "Category"}),
-    use_container_width=True
-)
-
-# 💸 Cash Burn Analysis
-st.markdown("#### 💸 Cash Burn Analysis (Last 3 Months)")
-
-if "PURCHASE_CATEGORY" in df.columns and "OPERATING_EXPENSES" in df.columns:
-    # Data Preprocessing for Cash Burn Analysis
-    recent_purchases = df[
-        df["MONTH"].isin(last_3_months) & df["PURCHASE_CATEGORY"].notnull()
-    ].copy()
-    recent_purchases = recent_purchases.rename(columns={"OPERATING_EXPENSES": "CASH_BURN"})
-
-    # ML Model: Linear Regression for Predicting Future Cash Burn
-    def linear_regression_forecast(cash_burn_data):
-        X = np.array(range(len(cash_burn_data))).reshape(-1, 1)
-        y = np.array(cash_burn_data.values)
-        model = LinearRegression()
-        model.fit(X, y)
-        future_month = np.array([[len(cash_burn_data)]])  # Predict next month
-        forecast = model.predict(future_month)
-        return forecast[0]
-
-    # Forecast for Next Month's Cash Burn
-    forecast_cash_burn = linear_regression_forecast(recent_purchases["CASH_BURN"])
+    # Monthly cash burn per group, with its linear trend forecasts, from the snapshot
+    burn_by = st.radio(
+        "Forecast cash burn by",
+        list(snapshot["cash_burn"]),
+        format_func=lambda col: col.replace("_", " ").title(),
+        horizontal=True,
+        key="burn_by",
+    )
+    params = {**run, "burn_by": burn_by}
+    burn = snapshot["cash_burn"][burn_by]
+    forecast_cash_burn = burn["forecast"]
     st.markdown(f"**Cash Burn Forecast for Next Month:** £{forecast_cash_burn:,.0f}")
 
     # Display Cash Burn Visualization
-    recent_purchases["MONTH"] = recent_purchases["MONTH"].astype(str)
-    recent_purchases["CASH_BURN"] = pd.to_numeric(recent_purchases["CASH_BURN"], errors="coerce")
-    fig_cash_burn = px.line(recent_purchases, x="MONTH", y="CASH_BURN", title="Cash Burn (Last 3 Months)")
-    st.plotly_chart(fig_cash_burn, use_container_width=True)
-
-    # Predict next month's cash burn for top 3 categories
-    top_3_categories = (
-        recent_purchases.groupby("PURCHASE_CATEGORY")["CASH_BURN"]
-        .sum()
-        .sort_values(ascending=False)
-        .head(3)
-        .reset_index()
-    )
-
-    for category in top_3_categories["PURCHASE_CATEGORY"]:
-        category_data = recent_purchases[recent_purchases["PURCHASE_CATEGORY"] == category]
-        next_month_cash_burn = linear_regression_forecast(category_data["CASH_BURN"])
-        top_3_categories.loc[
-            top_3_categories["PURCHASE_CATEGORY"] == category, "Next Month Prediction (£)"
-        ] = f"£{next_month_cash_burn:,.0f}"
+    st.plotly_chart(graph.cash_burn_line(params), use_container_width=True)
 
-    top_3_categories["Total (£)"] = top_3_categories["CASH_BURN"].apply(lambda x: f"£{x:,.0f}")
+    burn_forecasts = pd.DataFrame(burn["groups"])
+    burn_forecasts["Total (£)"] = burn_forecasts["CASH_BURN"].apply(lambda x: f"£{x:,.0f}")
+    burn_forecasts["Next Month Prediction (£)"] = burn_forecasts["FORECAST"].apply(lambda x: f"£{x:,.0f}")
     st.dataframe(
-        top_3_categories[["PURCHASE_CATEGORY", "Total (£)", "Next Month Prediction (£)"]]
-        .rename(columns={"PURCHASE_CATEGORY": "Category"}),
-        use_container_width=True
+        burn_forecasts[[burn_by, "Total (£)", "Next Month Prediction (£)"]]
+        .rename(columns={"PURCHASE_CATEGORY": "Category", "PRODUCTLINE": "Product Line"}),
+        use_container_width=True,
+        hide_index=True,
     )
 
     # Bar chart for Cash Burn Trend
-    burn_trend = (
-        recent_purchases.groupby(["MONTH", "PURCHASE_CATEGORY"])["CASH_BURN"]
-        .sum()
-        .reset_index()
-    )
-    burn_trend["MONTH"] = burn_trend["MONTH"].astype(str)
-
-    fig = px.bar(
-        burn_trend[burn_trend["PURCHASE_CATEGORY"].isin(top_3_categories["PURCHASE_CATEGORY"])],
-        x="MONTH",
-        y="CASH_BURN",
-        color="PURCHASE_CATEGORY",
-        barmode="group",
-        title="📊 Monthly Cash Burn by Category (Top 3)"
-    )
-    fig.update_traces(texttemplate="£%{y:,.0f}")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(graph.cash_burn_bar(params), use_container_width=True)
+
+
+with right_col_2, span("section.cash_burn"):
+    cash_burn_panel()
 
-else:
-    st.warning("PURCHASE_CATEGORY or OPERATING_EXPENSES column not found in data.")
 
 # === Export Option ===
+@st.fragment
+def export_panel():
+    export_fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True,
+                          format_func=lambda fmt: {"csv.gz": "CSV (gzip)", "parquet": "Parquet"}[fmt])
+    # Exports cover the rows the sidebar filters select, narrowed further here
+    export_range = st.radio("Date range", ["All months", "Last 3 months"], horizontal=True)
+    export_lines = st.multiselect("Product lines", snapshot["productlines"],
+                                  placeholder="All product lines")
+    export_scope = {
+        "months": last_3_months if export_range == "Last 3 months" else None,
+        "productlines": export_lines or None,
+        "filters": filters,
+    }
+
+    # Only serialized when the button is clicked, then reused for this data version.
+    # The cached file is handed over as an open handle, not read into bytes here.
+    def build_export():
+        return open(export_orders(data_backend, export_fmt, **export_scope), "rb")
+
+    extension, mime = EXPORT_FORMATS[export_fmt]
+    st.download_button("Download", data=build_export, file_name=f"Auto_Sales_Data.{extension}", mime=mime)
+
+
 st.markdown("### 📁 Export Raw Data")
-with st.expander("⬇️ Download Raw Data"):
-   st.download_button("Download CSV", data=df.to_csv(index=False), file_name="Auto_Sales_Data.csv", mime="text/csv")
+with st.expander("⬇️ Download Raw Data"), span("section.export"):
+    export_panel()
+
+# === Fill forecast cards as their background jobs complete ===
+pending = {future: model for model, future in revenue_forecasts.items()}
+# Backtest jobs are queued after this run's forecasts; stored results return at once
+backtest = graph.backtest(run)
+
+with span("section.forecast_wait"):
+    for future in as_completed(pending):
+        model = pending[future]
+        try:
+            forecast_cards[model].markdown(forecast_card_html(model, future.result()), unsafe_allow_html=True)
+        except Exception as exc:
+            forecast_cards[model].warning(f"{model} forecast unavailable: {exc}")
+    for fill in deferred:
+        fill()
+    deferred = None
+    try:
+        quality_card.markdown(quality_card_html(backtest.result()), unsafe_allow_html=True)
+    except Exception as exc:
+        quality_card.warning(f"Backtest unavailable: {exc}")
+
+# === Performance Debug Panel (this run's spans, in completion order) ===
+# Peak memory is only traced when the process writes DASHBOARD_METRICS_FILE
+if session_spans is not None:
+    with metrics_panel.container():
+        st.markdown("### 🐞 Spans (this run)")
+        st.dataframe(
+            pd.DataFrame(session_spans).reindex(columns=["span", "wall_s", "cpu_s", "peak_mb", "cache"]),
+            hide_index=True,
+            column_config={
+                "wall_s": st.column_config.NumberColumn("Wall (s)", format="%.4f"),
+                "cpu_s": st.column_config.NumberColumn("CPU (s)", format="%.4f"),
+                "peak_mb": st.column_config.NumberColumn("Peak (MB)", format="%.2f"),
+            },
+        )
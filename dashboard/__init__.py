@@ -0,0 +1 @@
+"""Data, caching and forecasting helpers for the Auto Sales dashboard."""
@@ -0,0 +1,127 @@
+"""Command line entry point for the dashboard's batch jobs.
+
+    python -m dashboard snapshot [--backend duckdb] [--pdf report.pdf]
+    python -m dashboard reports [--scope productline month category] [--out DIR]
+    python -m dashboard backtest [--folds 6]
+    python -m dashboard ingest new_orders.csv [more.csv ...]
+    python -m dashboard sql-load [--database orders.sqlite]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from dashboard.backends import BACKENDS, SQL_DATABASE, get_backend
+from dashboard.data import DATA_PATH
+from dashboard.reports import REPORT_SCOPES
+
+
+def snapshot(args) -> int:
+    from dashboard.kpis import compute_snapshot, write_snapshot
+    from dashboard.reports import generate_pdf
+
+    start = time.perf_counter()
+    backend = get_backend(args.backend, args.data)
+    kpi_snapshot = compute_snapshot(backend, forecasts=not args.no_forecasts)
+    path = write_snapshot(kpi_snapshot, args.out)
+    print(f"{path}: data version {kpi_snapshot['data_version']} in {time.perf_counter() - start:.2f}s")
+    if args.pdf is not None:
+        args.pdf.write_bytes(generate_pdf(kpi_snapshot))
+        print(f"{args.pdf}: KPI summary report")
+    return 0
+
+
+def reports(args) -> int:
+    import shutil
+
+    from dashboard.reports import generate_reports
+
+    start = time.perf_counter()
+    paths = generate_reports(get_backend(args.backend, args.data), args.scope)
+    if args.out is not None:
+        args.out.mkdir(parents=True, exist_ok=True)
+        for (scope, value), path in paths.items():
+            shutil.copyfile(path, args.out / f"KPI_Report_{scope}_{value.replace('/', '-')}.pdf")
+    print(f"{len(paths)} reports in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def backtest(args) -> int:
+    from dashboard.backtest import BACKTEST_FOLDS, Backtest, backtest_path, quality
+
+    start = time.perf_counter()
+    result = Backtest(get_backend(args.backend, args.data), folds=args.folds or BACKTEST_FOLDS).result()
+    for row in result["metrics"]:
+        if "error" in row:
+            print(f"{row['series']:<14} {row['model']:<7} failed: {row['error']}")
+        else:
+            mape = "n/a" if row["mape"] is None else f"{row['mape']:.1f}%"
+            coverage = "n/a" if row["coverage"] is None else f"{row['coverage']:.0%}"
+            print(f"{row['series']:<14} {row['model']:<7} MAPE {mape:>8}  RMSE {row['rmse']:>12,.0f}  "
+                  f"coverage {coverage:>4}")
+    headline = quality(result)
+    if headline is not None:
+        print(f"accuracy {headline['accuracy']:.1f}% ({headline['model']}), confidence {headline['confidence']}")
+    print(f"{backtest_path(result['data_version'], result['folds'])}: {len(result['months'])} folds in "
+          f"{time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def ingest(args) -> int:
+    from dashboard.ingest import main
+
+    return main([str(file) for file in args.files] + ["--data", str(args.data)])
+
+
+def sql_load(args) -> int:
+    from dashboard.backends import load_sqlite
+
+    start = time.perf_counter()
+    path = load_sqlite(args.data, args.database)
+    print(f"{path}: loaded {args.data} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard", description="Dashboard batch jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_cmd = commands.add_parser("snapshot", help="compute and store the KPI snapshot")
+    snapshot_cmd.add_argument("--data", type=Path, default=DATA_PATH, help="order data file")
+    snapshot_cmd.add_argument("--backend", choices=list(BACKENDS), help="data backend (default DASHBOARD_BACKEND)")
+    snapshot_cmd.add_argument("--out", type=Path, help="snapshot directory (default the cache dir)")
+    snapshot_cmd.add_argument("--no-forecasts", action="store_true", help="skip the revenue forecast models")
+    snapshot_cmd.add_argument("--pdf", type=Path, help="also render the KPI summary PDF here")
+    snapshot_cmd.set_defaults(run=snapshot)
+
+    reports_cmd = commands.add_parser("reports", help="render scoped KPI reports in the process pool")
+    reports_cmd.add_argument("--data", type=Path, default=DATA_PATH, help="order data file")
+    reports_cmd.add_argument("--backend", choices=list(BACKENDS), help="data backend (default DASHBOARD_BACKEND)")
+    reports_cmd.add_argument("--scope", nargs="+", choices=list(REPORT_SCOPES), default=list(REPORT_SCOPES),
+                             help="report scopes (default all)")
+    reports_cmd.add_argument("--out", type=Path, help="also copy the reports into this directory")
+    reports_cmd.set_defaults(run=reports)
+
+    backtest_cmd = commands.add_parser("backtest", help="backtest the forecasters and store the result")
+    backtest_cmd.add_argument("--data", type=Path, default=DATA_PATH, help="order data file")
+    backtest_cmd.add_argument("--backend", choices=list(BACKENDS), help="data backend (default DASHBOARD_BACKEND)")
+    backtest_cmd.add_argument("--folds", type=int, default=None, help="months to backtest (default DASHBOARD_BACKTEST_FOLDS or 6)")
+    backtest_cmd.set_defaults(run=backtest)
+
+    ingest_cmd = commands.add_parser("ingest", help="append new orders to the dataset")
+    ingest_cmd.add_argument("files", nargs="+", type=Path, help="delta CSV files, same columns as the main CSV")
+    ingest_cmd.add_argument("--data", type=Path, default=DATA_PATH, help="main order CSV")
+    ingest_cmd.set_defaults(run=ingest)
+
+    sql_cmd = commands.add_parser("sql-load", help="load the order data into a SQLite table for the sql backend")
+    sql_cmd.add_argument("--data", type=Path, default=DATA_PATH, help="order data file")
+    sql_cmd.add_argument("--database", type=Path, default=SQL_DATABASE,
+                         help="SQLite file to create (default DASHBOARD_SQL_DATABASE)")
+    sql_cmd.set_defaults(run=sql_load)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Monthly aggregate cube shared by the dashboard panels.
+
+One groupby over the order lines produces MONTH x PRODUCTLINE x
+PURCHASE_CATEGORY x CUSTOMERNAME sums. Panels roll this up further, so
+their cost depends on the number of months and categories rather than on
+the number of order lines.
+"""
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.data import (
+    CACHE_DIR, DATA_PATH, _load_prepared, _restore_categoricals, delta_parts, source_version, write_parquet_cache,
+)
+from dashboard.metrics import cached_call
+
+CUBE_DIR = CACHE_DIR / "cubes"
+
+CUBE_DIMENSIONS = ["MONTH", "PRODUCTLINE", "PURCHASE_CATEGORY", "CUSTOMERNAME"]
+CUBE_MEASURES = [
+    "SALES",
+    "QUANTITYORDERED",
+    "RAW_MATERIAL_COST",
+    "OPERATING_EXPENSES",
+    "GROSS_PROFIT",
+    "NET_PROFIT",
+]
+# Order line counts: all lines, and those with STATUS "Shipped"
+CUBE_COUNTS = ["ORDER_LINES", "SHIPPED_LINES"]
+
+
+def build_monthly_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate order lines into one row per populated cube cell."""
+    lines = df[CUBE_DIMENSIONS + CUBE_MEASURES[:4]].assign(
+        GROSS_PROFIT=df["SALES"] - df["RAW_MATERIAL_COST"],
+        NET_PROFIT=df["SALES"] - df["RAW_MATERIAL_COST"] - df["OPERATING_EXPENSES"],
+        ORDER_LINES=1,
+        SHIPPED_LINES=(df["STATUS"] == "Shipped").astype("int64"),
+    )
+    grouped = lines.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=True)
+    return grouped[CUBE_MEASURES + CUBE_COUNTS].sum().reset_index()
+
+
+def combine_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    """Merge cubes by summing the measures of matching cells."""
+    merged = _restore_categoricals(pd.concat(cubes, ignore_index=True))
+    grouped = merged.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=True)
+    return grouped[CUBE_MEASURES + CUBE_COUNTS].sum().reset_index()
+
+
+def _cube_path(path: str, version: str, parts: tuple) -> Path:
+    # The column list is part of the key, so cubes cached before a schema change are rebuilt
+    columns = ",".join(CUBE_DIMENSIONS + CUBE_MEASURES + CUBE_COUNTS)
+    key = "|".join((version, columns) + tuple(Path(part).name for part in parts))
+    return CUBE_DIR / f"{Path(path).stem}.{hashlib.sha1(key.encode()).hexdigest()[:16]}.parquet"
+
+
+@lru_cache(maxsize=16)
+def _cube_for(path: str, version: str, parts: tuple = ()) -> pd.DataFrame:
+    stored = _cube_path(path, version, parts)
+    if stored.exists():
+        try:
+            return _restore_categoricals(pd.read_parquet(stored))
+        except (ImportError, OSError, ValueError):
+            pass
+    if not parts:
+        cube = build_monthly_cube(_load_prepared(path, version))
+    else:
+        # The cube without the newest part is normally cached in memory or on
+        # disk, so an ingest only aggregates the new rows and merges them in.
+        previous = _cube_for(path, version, parts[:-1])
+        cube = combine_cubes(previous, build_monthly_cube(pd.read_parquet(parts[-1])))
+    write_parquet_cache(cube, stored, stale_glob=f"{Path(path).stem}.*.parquet")
+    return cube
+
+
+def load_monthly_cube(path=DATA_PATH) -> pd.DataFrame:
+    """Return the cube for the current version of the order data."""
+    return cached_call("data.cube", _cube_for, str(path), source_version(path), delta_parts(path))
+
+
+def last_months(cube: pd.DataFrame, n: int = 3) -> list:
+    """The ``n`` calendar months ending at the cube's latest month, oldest
+    first, whether or not each has data (a filtered cube can have gaps).
+    """
+    if cube.empty:
+        return []
+    return list(pd.period_range(end=cube["MONTH"].max(), periods=n, freq="M"))
+
+
+def rollup(cube: pd.DataFrame, by, months=None, measures=None) -> pd.DataFrame:
+    """Sum cube measures over ``by``, optionally restricted to ``months``."""
+    if months is not None:
+        cube = cube[cube["MONTH"].isin(months)]
+    measures = measures or CUBE_MEASURES + CUBE_COUNTS
+    return cube.groupby(by, observed=True)[measures].sum()
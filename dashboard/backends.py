@@ -0,0 +1,383 @@
+"""Data backends that answer the dashboard's aggregate queries.
+
+Every panel reads from the monthly cube (see ``dashboard.aggregates``), so
+a backend only has to produce that cube and, for exports, stream the raw
+order rows. ``DASHBOARD_BACKEND`` picks the backend:
+
+- ``pandas`` (default): the whole CSV in memory, with ingested deltas.
+- ``chunked``: streams CSV or Parquet in row chunks and folds each chunk
+  into the cube, so peak memory is bounded by the cube, not the row count.
+- ``duckdb``: pushes the cube GROUP BY down to an embedded DuckDB
+  (optional dependency), which scans the file out of core.
+- ``sql``: reads an ``orders`` table in a relational database (SQLite,
+  ``DASHBOARD_SQL_DATABASE``) over pooled connections. Every query is an
+  aggregation pushed into the database, so only small result sets come
+  back; results are cached for ``DASHBOARD_SQL_TTL`` seconds.
+"""
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.aggregates import CUBE_DIMENSIONS, build_monthly_cube, combine_cubes, load_monthly_cube, rollup
+from dashboard.data import (
+    CACHE_DIR, DATA_PATH, DATE_FORMAT, _restore_categoricals, data_version, load_orders, prepare_orders,
+    source_version,
+)
+from dashboard.metrics import cached_call, span
+
+CHUNK_ROWS = 250_000
+CUBE_SOURCE_COLUMNS = [
+    "ORDERDATE", "PRODUCTLINE", "PURCHASE_CATEGORY", "CUSTOMERNAME",
+    "SALES", "QUANTITYORDERED", "RAW_MATERIAL_COST", "OPERATING_EXPENSES", "STATUS",
+]
+
+
+class DataBackend:
+    """Base class: subclasses implement ``cube`` and ``iter_orders``."""
+
+    name = ""
+
+    def __init__(self, path=DATA_PATH):
+        self.path = Path(path)
+
+    def version(self) -> str:
+        return source_version(self.path)
+
+    def cube(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def iter_orders(self, chunk_rows: int = CHUNK_ROWS):
+        """Yield the prepared order rows in chunks of at most ``chunk_rows``."""
+        raise NotImplementedError
+
+    # The dashboard's queries, answered from the cube
+
+    def monthly_revenue(self) -> pd.Series:
+        return rollup(self.cube(), "MONTH", measures=["SALES"])["SALES"]
+
+    def productline_sales(self, months=None) -> pd.DataFrame:
+        return rollup(self.cube(), "PRODUCTLINE", months, ["SALES", "QUANTITYORDERED", "ORDER_LINES"])
+
+    def category_burn(self, months=None, by="PURCHASE_CATEGORY") -> pd.DataFrame:
+        burn = rollup(self.cube(), ["MONTH", by], months, ["OPERATING_EXPENSES"])
+        return burn.rename(columns={"OPERATING_EXPENSES": "CASH_BURN"}).reset_index()
+
+    def customer_sales(self, productline, months=None) -> pd.Series:
+        cube = self.cube()
+        return rollup(cube[cube["PRODUCTLINE"] == productline], "CUSTOMERNAME", months, ["SALES"])["SALES"]
+
+
+class PandasBackend(DataBackend):
+    name = "pandas"
+
+    def version(self) -> str:
+        return data_version(self.path)
+
+    def cube(self) -> pd.DataFrame:
+        return load_monthly_cube(self.path)
+
+    def iter_orders(self, chunk_rows: int = CHUNK_ROWS):
+        df = load_orders(self.path)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def _read_chunks(path: Path, columns=None, chunk_rows: int = CHUNK_ROWS):
+    """Yield raw chunks of a CSV or Parquet order file."""
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        usecols = None if columns is None else lambda col: col.strip() in columns
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunk_rows)
+
+
+def _prepare_cube_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk.columns = chunk.columns.str.strip()
+    if not pd.api.types.is_datetime64_any_dtype(chunk["ORDERDATE"]):
+        chunk["ORDERDATE"] = pd.to_datetime(chunk["ORDERDATE"], format=DATE_FORMAT)
+    chunk["MONTH"] = chunk["ORDERDATE"].dt.to_period("M")
+    return chunk
+
+
+@lru_cache(maxsize=4)
+def _streamed_cube(path: str, version: str, chunk_rows: int) -> pd.DataFrame:
+    cube = None
+    for chunk in _read_chunks(Path(path), CUBE_SOURCE_COLUMNS, chunk_rows):
+        chunk_cube = build_monthly_cube(_prepare_cube_chunk(chunk))
+        cube = chunk_cube if cube is None else combine_cubes(cube, chunk_cube)
+    return cube
+
+
+class ChunkedBackend(DataBackend):
+    name = "chunked"
+
+    def __init__(self, path=DATA_PATH, chunk_rows: int = CHUNK_ROWS):
+        super().__init__(path)
+        self.chunk_rows = chunk_rows
+
+    def cube(self) -> pd.DataFrame:
+        return cached_call("data.cube", _streamed_cube, str(self.path), self.version(), self.chunk_rows)
+
+    def iter_orders(self, chunk_rows: int = None):
+        for chunk in _read_chunks(self.path, chunk_rows=chunk_rows or self.chunk_rows):
+            yield prepare_orders(chunk)
+
+
+@lru_cache(maxsize=4)
+def _duckdb_cube(path: str, version: str) -> pd.DataFrame:
+    import duckdb
+
+    if path.endswith(".parquet"):
+        source = "read_parquet(?)"
+        orderdate = "CAST(ORDERDATE AS TIMESTAMP)"
+    else:
+        source = "read_csv(?, header = true, all_varchar = true)"
+        orderdate = f"strptime(ORDERDATE, '{DATE_FORMAT}')"
+    query = f"""
+        SELECT
+            date_trunc('month', {orderdate}) AS MONTH,
+            PRODUCTLINE, PURCHASE_CATEGORY, CUSTOMERNAME,
+            SUM(CAST(SALES AS DOUBLE)) AS SALES,
+            CAST(SUM(CAST(QUANTITYORDERED AS BIGINT)) AS BIGINT) AS QUANTITYORDERED,
+            SUM(CAST(RAW_MATERIAL_COST AS DOUBLE)) AS RAW_MATERIAL_COST,
+            SUM(CAST(OPERATING_EXPENSES AS DOUBLE)) AS OPERATING_EXPENSES,
+            SUM(CAST(SALES AS DOUBLE) - CAST(RAW_MATERIAL_COST AS DOUBLE)) AS GROSS_PROFIT,
+            SUM(CAST(SALES AS DOUBLE) - CAST(RAW_MATERIAL_COST AS DOUBLE)
+                - CAST(OPERATING_EXPENSES AS DOUBLE)) AS NET_PROFIT,
+            COUNT(*) AS ORDER_LINES,
+            COUNT(*) FILTER (WHERE STATUS = 'Shipped') AS SHIPPED_LINES
+        FROM {source}
+        GROUP BY ALL
+        ORDER BY ALL
+    """
+    with duckdb.connect() as con:
+        cube = con.execute(query, [path]).df()
+    cube["MONTH"] = pd.to_datetime(cube["MONTH"]).dt.to_period("M")
+    return _restore_categoricals(cube).sort_values(CUBE_DIMENSIONS, ignore_index=True)
+
+
+class DuckDBBackend(DataBackend):
+    name = "duckdb"
+
+    def cube(self) -> pd.DataFrame:
+        return cached_call("data.cube", _duckdb_cube, str(self.path), self.version())
+
+    def iter_orders(self, chunk_rows: int = CHUNK_ROWS):
+        for chunk in _read_chunks(self.path, chunk_rows=chunk_rows):
+            yield prepare_orders(chunk)
+
+
+SQL_DATABASE = Path(os.environ.get("DASHBOARD_SQL_DATABASE", CACHE_DIR / "orders.sqlite"))
+SQL_POOL_SIZE = int(os.environ.get("DASHBOARD_SQL_POOL_SIZE", "4"))
+# Seconds a query result (and the data version) is reused before asking the database again
+SQL_TTL = float(os.environ.get("DASHBOARD_SQL_TTL", "60"))
+SQL_TABLE = "orders"
+SQL_MONTH = "substr(ORDERDATE, 1, 7)"
+
+
+class ConnectionPool:
+    """At most ``size`` DB-API connections, opened on demand and reused."""
+
+    def __init__(self, connect, size: int = SQL_POOL_SIZE):
+        self.connect = connect
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self.slots:
+            try:
+                con = self.idle.get_nowait()
+            except queue.Empty:
+                con = self.connect()
+            try:
+                yield con
+            except Exception:
+                con.close()
+                raise
+            self.idle.put(con)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_results = {}
+_results_lock = threading.Lock()
+
+
+def _sqlite_pool(database: str) -> ConnectionPool:
+    with _pools_lock:
+        if database not in _pools:
+            uri = f"{Path(database).resolve().as_uri()}?mode=ro"
+            _pools[database] = ConnectionPool(lambda: sqlite3.connect(uri, uri=True, check_same_thread=False))
+        return _pools[database]
+
+
+def _ttl_query(database: str, sql: str, params=(), ttl: float = SQL_TTL) -> pd.DataFrame:
+    """Run ``sql`` on a pooled connection, reusing a result fetched less than
+    ``ttl`` seconds ago (by any caller).
+    """
+    key = (database, sql, tuple(params))
+    now = time.monotonic()
+    with span("sql.query") as s:
+        with _results_lock:
+            cached = _results.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            s.set(cache="hit")
+            return cached[1]
+        s.set(cache="miss")
+        with _sqlite_pool(database).connection() as con:
+            cursor = con.execute(sql, tuple(params))
+            frame = pd.DataFrame.from_records(cursor.fetchall(), columns=[col[0] for col in cursor.description])
+        with _results_lock:
+            # Drop expired results so the cache stays bounded by what is in use
+            for stale in [k for k, (fetched, _) in _results.items() if now - fetched >= max(ttl, SQL_TTL)]:
+                del _results[stale]
+            _results[key] = (now, frame)
+        return frame
+
+
+def _month_filter(months) -> tuple:
+    """``(WHERE clause, params)`` restricting to ``months`` (all when None)."""
+    if months is None:
+        return "", []
+    months = [str(month) for month in months]
+    return f"WHERE {SQL_MONTH} IN ({', '.join('?' * len(months))})", months
+
+
+def _periods(frame: pd.DataFrame) -> pd.DataFrame:
+    frame["MONTH"] = pd.PeriodIndex(frame["MONTH"], freq="M")
+    return frame
+
+
+@lru_cache(maxsize=4)
+def _sql_cube(database: str, version: str) -> pd.DataFrame:
+    # Keyed on the data version, so the cube outlives the TTL while the table is unchanged
+    query = f"""
+        SELECT
+            {SQL_MONTH} AS MONTH, PRODUCTLINE, PURCHASE_CATEGORY, CUSTOMERNAME,
+            SUM(SALES) AS SALES,
+            SUM(QUANTITYORDERED) AS QUANTITYORDERED,
+            SUM(RAW_MATERIAL_COST) AS RAW_MATERIAL_COST,
+            SUM(OPERATING_EXPENSES) AS OPERATING_EXPENSES,
+            SUM(SALES - RAW_MATERIAL_COST) AS GROSS_PROFIT,
+            SUM(SALES - RAW_MATERIAL_COST - OPERATING_EXPENSES) AS NET_PROFIT,
+            COUNT(*) AS ORDER_LINES,
+            SUM(STATUS = 'Shipped') AS SHIPPED_LINES
+        FROM {SQL_TABLE}
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4
+    """
+    with _sqlite_pool(database).connection() as con:
+        cursor = con.execute(query)
+        cube = pd.DataFrame.from_records(cursor.fetchall(), columns=[col[0] for col in cursor.description])
+    return _restore_categoricals(_periods(cube))
+
+
+class SqlBackend(DataBackend):
+    """Aggregates pushed down to an ``orders`` table with the CSV's columns
+    (ORDERDATE stored as ``YYYY-MM-DD`` text). ``path`` is kept for the
+    interface; the data comes from ``database``.
+    """
+
+    name = "sql"
+
+    def __init__(self, path=DATA_PATH, database=None, ttl: float = SQL_TTL):
+        super().__init__(path)
+        self.database = str(database or SQL_DATABASE)
+        self.ttl = ttl
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        return _ttl_query(self.database, sql, params, self.ttl)
+
+    def version(self) -> str:
+        stats = self._query(f"SELECT COUNT(*), MAX(ORDERDATE), SUM(SALES) FROM {SQL_TABLE}")
+        key = "|".join([self.database] + [str(value) for value in stats.iloc[0]])
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def cube(self) -> pd.DataFrame:
+        return cached_call("data.cube", _sql_cube, self.database, self.version())
+
+    def monthly_revenue(self) -> pd.Series:
+        monthly = self._query(f"""
+            SELECT {SQL_MONTH} AS MONTH, SUM(SALES) AS SALES FROM {SQL_TABLE} GROUP BY 1 ORDER BY 1
+        """)
+        return _periods(monthly.copy()).set_index("MONTH")["SALES"]
+
+    def productline_sales(self, months=None) -> pd.DataFrame:
+        where, params = _month_filter(months)
+        lines = self._query(f"""
+            SELECT PRODUCTLINE, SUM(SALES) AS SALES, SUM(QUANTITYORDERED) AS QUANTITYORDERED,
+                   COUNT(*) AS ORDER_LINES
+            FROM {SQL_TABLE} {where} GROUP BY 1 ORDER BY 1
+        """, params)
+        return lines.set_index("PRODUCTLINE")
+
+    def category_burn(self, months=None, by="PURCHASE_CATEGORY") -> pd.DataFrame:
+        if by not in CUBE_DIMENSIONS:
+            raise ValueError(f"Cannot group cash burn by {by!r}")
+        where, params = _month_filter(months)
+        burn = self._query(f"""
+            SELECT {SQL_MONTH} AS MONTH, {by}, SUM(OPERATING_EXPENSES) AS CASH_BURN
+            FROM {SQL_TABLE} {where} GROUP BY 1, 2 ORDER BY 1, 2
+        """, params)
+        return _periods(burn.copy())
+
+    def customer_sales(self, productline, months=None) -> pd.Series:
+        where, params = _month_filter(months)
+        where = f"{where} AND PRODUCTLINE = ?" if where else "WHERE PRODUCTLINE = ?"
+        customers = self._query(f"""
+            SELECT CUSTOMERNAME, SUM(SALES) AS SALES
+            FROM {SQL_TABLE} {where} GROUP BY 1 ORDER BY 1
+        """, [*params, str(productline)])
+        return customers.set_index("CUSTOMERNAME")["SALES"]
+
+    def iter_orders(self, chunk_rows: int = CHUNK_ROWS):
+        # Exports stream the table; this is the one query that returns rows
+        with _sqlite_pool(self.database).connection() as con:
+            cursor = con.execute(f"SELECT * FROM {SQL_TABLE} ORDER BY ORDERDATE")
+            columns = [col[0] for col in cursor.description]
+            while rows := cursor.fetchmany(chunk_rows):
+                chunk = pd.DataFrame.from_records(rows, columns=columns)
+                chunk["ORDERDATE"] = pd.to_datetime(chunk["ORDERDATE"])
+                yield prepare_orders(chunk)
+
+
+def load_sqlite(source=DATA_PATH, database=SQL_DATABASE, chunk_rows: int = CHUNK_ROWS) -> Path:
+    """Load an order CSV (or Parquet) file into a new SQLite ``orders`` table,
+    indexed for the dashboard's month and product-line queries.
+    """
+    database = Path(database)
+    database.parent.mkdir(parents=True, exist_ok=True)
+    tmp = database.with_suffix(f".{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    with sqlite3.connect(tmp) as con:
+        for chunk in _read_chunks(Path(source), chunk_rows=chunk_rows):
+            chunk = _prepare_cube_chunk(chunk).drop(columns="MONTH")
+            chunk["ORDERDATE"] = chunk["ORDERDATE"].dt.strftime("%Y-%m-%d")
+            chunk.to_sql(SQL_TABLE, con, if_exists="append", index=False)
+        con.execute(f"CREATE INDEX {SQL_TABLE}_month ON {SQL_TABLE} ({SQL_MONTH}, PRODUCTLINE)")
+    con.close()
+    os.replace(tmp, database)
+    return database
+
+
+BACKENDS = {backend.name: backend for backend in (PandasBackend, ChunkedBackend, DuckDBBackend, SqlBackend)}
+
+
+def get_backend(name: str = None, path=DATA_PATH) -> DataBackend:
+    """Backend chosen by ``name`` or ``DASHBOARD_BACKEND`` (default pandas)."""
+    name = name or os.environ.get("DASHBOARD_BACKEND", "pandas")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown data backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](path)
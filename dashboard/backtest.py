@@ -0,0 +1,287 @@
+"""Rolling-origin backtests of the forecasters.
+
+For each of the last ``BACKTEST_FOLDS`` months, every enabled model is
+trained on the months before it and forecasts that month. The series are
+monthly revenue, gross and net profit, and cash burn. Per series and
+model the backtest reports MAPE, RMSE and the coverage of the nominal
+``INTERVAL`` prediction interval:
+
+- ARIMA: the model's own forecast interval. One job per series walks the
+  origins in order. It updates the previous fit with the new month
+  (``append(refit=False)``), and refits only every ``ARIMA_MAX_UPDATES``
+  origins.
+- LSTM: one job per fold trains a shared model on all series, so folds
+  run in parallel. The network gives no interval of its own, so the
+  interval comes from the errors of the earlier folds. The first fold has
+  no interval.
+- linear: the closed-form OLS prediction interval, computed in the app
+  process.
+
+Jobs run in the shared process pool. Results are written to
+``BACKTEST_DIR`` per data version and read back from there, so the
+accuracy card costs a file read on every later load.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from dashboard.aggregates import rollup
+from dashboard.data import CACHE_DIR
+from dashboard.forecasting import ARIMA_MAX_UPDATES, ARIMA_ORDER, LSTM_EPOCHS, enabled_backends
+from dashboard.metrics import span
+
+BACKTEST_DIR = CACHE_DIR / "backtests"
+# Bumped whenever the result layout changes, so older files are ignored
+BACKTEST_FORMAT = 1
+BACKTEST_FOLDS = int(os.environ.get("DASHBOARD_BACKTEST_FOLDS", "6"))
+# Every fold trains on at least this many months
+MIN_TRAIN_MONTHS = 12
+# Nominal coverage of the prediction intervals
+INTERVAL = 0.8
+BACKTEST_MODELS = ["arima", "lstm", "linear"]
+# Cube measure -> series name
+BACKTEST_SERIES = {"SALES": "SALES", "GROSS_PROFIT": "GROSS_PROFIT", "NET_PROFIT": "NET_PROFIT",
+                   "OPERATING_EXPENSES": "CASH_BURN"}
+# Coverage within this distance of INTERVAL counts as well calibrated
+COVERAGE_TOLERANCE = 0.15
+
+
+def backtest_series(cube: pd.DataFrame) -> dict:
+    """Monthly series to backtest, keyed by name, with empty months as zero."""
+    monthly = rollup(cube, "MONTH", measures=list(BACKTEST_SERIES))
+    months = pd.period_range(monthly.index.min(), monthly.index.max(), freq="M")
+    monthly = monthly.reindex(months, fill_value=0.0)
+    return {name: monthly[measure].astype("float64").rename(name) for measure, name in BACKTEST_SERIES.items()}
+
+
+def fold_origins(n_months: int, folds: int = BACKTEST_FOLDS) -> list:
+    """Positions of the months forecast by each fold (the training cut-offs)."""
+    return list(range(max(MIN_TRAIN_MONTHS, n_months - folds), n_months))
+
+
+def _z() -> float:
+    return NormalDist().inv_cdf(0.5 + INTERVAL / 2)
+
+
+def arima_folds(series: pd.Series, origins: list, order=ARIMA_ORDER) -> list:
+    """``(forecast, lower, upper)`` per origin, updating one fit between origins."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    results, model_fit, updates = [], None, 0
+    for origin in origins:
+        if model_fit is None or updates >= ARIMA_MAX_UPDATES:
+            model_fit = ARIMA(series.iloc[:origin], order=order).fit()
+            updates = 0
+        else:
+            model_fit = model_fit.append(series.iloc[len(model_fit.data.endog):origin], refit=False)
+            updates += 1
+        prediction = model_fit.get_forecast(steps=1)
+        lower, upper = np.asarray(prediction.conf_int(alpha=1 - INTERVAL))[0]
+        results.append((float(np.asarray(prediction.predicted_mean)[0]), float(lower), float(upper)))
+    return results
+
+
+def lstm_fold(series_list: list, origin: int, epochs: int = LSTM_EPOCHS) -> list:
+    """Forecasts of month ``origin`` for every series, from one shared model."""
+    from dashboard.lstm import train_and_forecast
+
+    forecasts, _ = train_and_forecast([np.asarray(series[:origin], dtype="float64") for series in series_list],
+                                      epochs=epochs)
+    return forecasts
+
+
+def linear_folds(series: pd.Series, origins: list) -> list:
+    """``(forecast, lower, upper)`` per origin from an OLS trend on the months before it."""
+    values = series.to_numpy(dtype="float64")
+    results = []
+    for origin in origins:
+        t, y = np.arange(origin, dtype="float64"), values[:origin]
+        slope, intercept = np.polyfit(t, y, 1)
+        residuals = y - (intercept + slope * t)
+        s = np.sqrt(residuals @ residuals / max(origin - 2, 1))
+        spread = s * np.sqrt(1 + 1 / origin + (origin - t.mean()) ** 2 / ((t - t.mean()) ** 2).sum())
+        forecast = float(intercept + slope * origin)
+        results.append((forecast, forecast - _z() * spread, forecast + _z() * spread))
+    return results
+
+
+def _empirical_intervals(forecasts: list, actuals: np.ndarray) -> list:
+    """Intervals from the absolute errors of the earlier folds (none for the first)."""
+    results = []
+    for i, forecast in enumerate(forecasts):
+        errors = np.abs(np.asarray(forecasts[:i]) - actuals[:i])
+        if i == 0:
+            results.append((forecast, None, None))
+        else:
+            spread = float(np.quantile(errors, INTERVAL))
+            results.append((forecast, forecast - spread, forecast + spread))
+    return results
+
+
+def score(folds: list, actuals: np.ndarray) -> dict:
+    """MAPE (%), RMSE and interval coverage of ``(forecast, lower, upper)`` folds."""
+    forecasts = np.array([fold[0] for fold in folds])
+    errors = forecasts - actuals
+    nonzero = actuals != 0
+    covered = [lower <= actual <= upper for (_, lower, upper), actual in zip(folds, actuals) if lower is not None]
+    return {
+        "mape": float(np.mean(np.abs(errors[nonzero] / actuals[nonzero])) * 100) if nonzero.any() else None,
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "coverage": float(np.mean(covered)) if covered else None,
+        "folds": len(folds),
+    }
+
+
+def quality(result: dict, series: str = "SALES"):
+    """Headline accuracy for ``series``: the model with the lowest MAPE.
+
+    Returns ``{"model", "accuracy", "coverage", "confidence"}``, or None
+    when no model could be scored. Confidence is "High" when the interval
+    coverage is within ``COVERAGE_TOLERANCE`` of nominal (or above it),
+    "Medium" within twice that, "Low" otherwise.
+    """
+    scored = [row for row in result["metrics"] if row["series"] == series and row.get("mape") is not None]
+    if not scored:
+        return None
+    best = min(scored, key=lambda row: row["mape"])
+    coverage = best["coverage"]
+    if coverage is None:
+        confidence = "Unknown"
+    elif coverage >= INTERVAL - COVERAGE_TOLERANCE:
+        confidence = "High"
+    elif coverage >= INTERVAL - 2 * COVERAGE_TOLERANCE:
+        confidence = "Medium"
+    else:
+        confidence = "Low"
+    return {"model": best["model"], "accuracy": max(100.0 - best["mape"], 0.0), "coverage": coverage,
+            "confidence": confidence}
+
+
+def backtest_path(version: str, folds: int = BACKTEST_FOLDS, directory=None) -> Path:
+    return Path(directory or BACKTEST_DIR) / f"backtest-v{BACKTEST_FORMAT}-{version}-{folds}.json"
+
+
+def write_backtest(result: dict, directory=None) -> Path:
+    """Atomically write ``result`` under its data version and fold count and return the path."""
+    path = backtest_path(result["data_version"], result["folds"], directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f, indent=1)
+        os.replace(tmp, path)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
+    return path
+
+
+@lru_cache(maxsize=8)
+def _read_backtest(path: str, mtime_ns: int) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_backtest(version: str, folds: int = BACKTEST_FOLDS, directory=None):
+    """The stored backtest for ``version``, or None if there is none."""
+    path = backtest_path(version, folds, directory)
+    try:
+        return _read_backtest(str(path), path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+
+
+class Backtest:
+    """A backtest of one data version, stored or in flight.
+
+    ``result()`` waits for the pool jobs, scores them and stores the result.
+    """
+
+    def __init__(self, backend, models=None, folds: int = BACKTEST_FOLDS):
+        self.version = backend.version()
+        self.folds = folds
+        self.stored = read_backtest(self.version, folds)
+        self._lock = threading.Lock()
+        if self.stored is not None:
+            return
+        from dashboard.executor import submit_job
+
+        self.models = [model for model in (models or BACKTEST_MODELS)
+                       if model == "linear" or model in enabled_backends()]
+        self.series = backtest_series(backend.cube())
+        n_months = len(next(iter(self.series.values())))
+        self.origins = fold_origins(n_months, folds)
+        self.arima_jobs, self.lstm_jobs = {}, {}
+        if not self.origins:
+            return
+        if "arima" in self.models:
+            for name, series in self.series.items():
+                self.arima_jobs[name] = submit_job(arima_folds, series, self.origins)
+        if "lstm" in self.models:
+            series_list = [series.to_numpy() for series in self.series.values()]
+            for origin in self.origins:
+                self.lstm_jobs[origin] = submit_job(lstm_fold, series_list, origin)
+
+    def _folds(self, model: str, name: str, actuals: np.ndarray):
+        if model == "linear":
+            return linear_folds(self.series[name], self.origins)
+        if model == "arima":
+            return self.arima_jobs[name].result()
+        position = list(self.series).index(name)
+        forecasts = [self.lstm_jobs[origin].result()[position] for origin in self.origins]
+        return _empirical_intervals(forecasts, actuals)
+
+    def result(self) -> dict:
+        with self._lock:
+            if self.stored is not None:
+                return self.stored
+            with span("backtest.score", folds=len(self.origins)):
+                metrics = []
+                for name, series in self.series.items():
+                    actuals = series.to_numpy(dtype="float64")[self.origins]
+                    for model in self.models:
+                        if not self.origins:
+                            continue
+                        try:
+                            folds = self._folds(model, name, actuals)
+                        except Exception as exc:
+                            metrics.append({"series": name, "model": model, "error": type(exc).__name__})
+                            continue
+                        metrics.append({"series": name, "model": model, **score(folds, actuals)})
+            self.stored = {
+                "format": BACKTEST_FORMAT,
+                "data_version": self.version,
+                "generated_at": time.time(),
+                "folds": self.folds,
+                "interval": INTERVAL,
+                "months": [str(series.index[origin]) for origin in self.origins],
+                "metrics": metrics,
+            }
+            try:
+                write_backtest(self.stored)
+            except OSError:
+                pass
+            return self.stored
+
+
+_backtests = {}
+_backtests_lock = threading.Lock()
+
+
+def start_backtest(backend) -> Backtest:
+    """The backtest of the backend's current data version, shared by all
+    sessions; its jobs are submitted once.
+    """
+    version = backend.version()
+    with _backtests_lock:
+        backtest = _backtests.get(version)
+        if backtest is None:
+            backtest = _backtests[version] = Backtest(backend)
+        return backtest
@@ -0,0 +1,116 @@
+"""The dashboard's Plotly figures, built from bounded aggregates.
+
+Every figure is drawn from rolled-up data (snapshot records or forecast
+tables), never from order rows: a handful of bars, slices or months.
+Line charts pass their points through LTTB downsampling
+(Largest-Triangle-Three-Buckets), so a long history is capped at
+``MAX_POINTS`` while keeping its visual shape.
+
+Figures are memoized as nodes of ``dashboard.graph``, keyed by the data
+version, filter state and chart options, and shared by all sessions. A
+rerun therefore skips the Plotly Express build and sends a
+byte-identical spec, which Streamlit's message cache lets the browser
+reuse. Cached figures must not be mutated.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+MAX_POINTS = 500
+
+
+def lttb(x, y, threshold: int = MAX_POINTS) -> np.ndarray:
+    """Indices of the ``threshold`` points LTTB keeps out of ``(x, y)``.
+
+    The first and last points are always kept; every bucket in between
+    keeps the point forming the largest triangle with the previously kept
+    point and the next bucket's mean.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    keep = np.empty(threshold, dtype="int64")
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        mean_x, mean_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def waterfall(profit_walk: list):
+    """Net profit walk over the snapshot's window months."""
+    months = [str(row["MONTH"]) for row in profit_walk]
+    values = [row["NET_PROFIT"] for row in profit_walk]
+    figure = go.Figure(go.Waterfall(
+        name="Net Profit",
+        orientation="v",
+        x=months,
+        y=values,
+        text=[f"£{value:,.0f}" for value in values],
+        textposition="outside",
+        connector={"line": {"color": "gray"}},
+    ))
+    figure.update_layout(yaxis_title="Net Profit (£)", title="", waterfallgap=0.3, margin=dict(t=30, b=30))
+    return figure
+
+
+def cash_burn_line(monthly: list, title: str):
+    """Total cash burn per month, LTTB-downsampled past ``MAX_POINTS`` months."""
+    months = np.array([str(row["MONTH"]) for row in monthly])
+    burn = np.array([row["CASH_BURN"] for row in monthly], dtype="float64")
+    keep = lttb(np.arange(len(burn)), burn)
+    return px.line(x=months[keep], y=burn[keep], labels={"x": "MONTH", "y": "CASH_BURN"}, title=title)
+
+
+def cash_burn_bars(trend: list, groups: list, by: str, top: int = 3):
+    """Monthly cash burn of the ``top`` groups by total burn."""
+    trend = pd.DataFrame(trend)
+    top_groups = [row[by] for row in groups[:top]]
+    figure = px.bar(
+        trend[trend[by].isin(top_groups)],
+        x="MONTH",
+        y="CASH_BURN",
+        color=by,
+        barmode="group",
+        title="📊 Monthly Cash Burn (Top 3)",
+    )
+    figure.update_traces(texttemplate="£%{y:,.0f}")
+    return figure
+
+
+def inventory_bars(forecasts: pd.DataFrame, top: int = 5):
+    """Predicted units for the ``top`` product lines."""
+    summary = forecasts.assign(**{"Predicted Orders": forecasts["FORECAST"].round().astype(int)})
+    figure = px.bar(
+        summary.sort_values("Predicted Orders", ascending=False).head(top),
+        x="PRODUCTLINE",
+        y="Predicted Orders",
+        title="Next Month Forecast: Top 5 Product Lines (by Units Ordered)",
+        text="Predicted Orders",
+    )
+    figure.update_traces(texttemplate='%{text}', hovertemplate='Product Line: %{x}<br>Units: %{y}')
+    figure.update_layout(xaxis_title="Product Line", yaxis_title="Forecasted Units")
+    return figure
+
+
+def forecast_pie(forecasts: pd.DataFrame, by: str, label: str, top: int = 3):
+    """Share of next month's forecast among the ``top`` segments."""
+    figure = px.pie(
+        forecasts.nlargest(top, "FORECAST"),
+        values="FORECAST",
+        names=by,
+        title=f"Next Month Forecast (Top 3 {label}s)",
+        hole=0.3,
+    )
+    figure.update_traces(textinfo='percent+label', hovertemplate=f'{label}: %{{label}}<br>£%{{value:,.0f}}')
+    return figure
+
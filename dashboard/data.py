@@ -0,0 +1,165 @@
+"""Loading and preparing the Auto Sales order data.
+
+The CSV is parsed once per (path, mtime, size). The prepared frame is
+written to a typed Parquet sidecar in ``CACHE_DIR`` so later processes
+memory-map it instead of re-parsing the CSV. Orders ingested since the
+CSV was last replaced live as prepared Parquet delta parts next to it
+(see ``dashboard.ingest``) and are appended on load.
+
+The prepared frame is compact: text columns are categoricals and integer
+columns are downcast to the smallest type that holds their values.
+Streamed chunks (``DataBackend.iter_orders``) keep full-width integers,
+since a per-chunk downcast would give each chunk a different width. One
+frame per data version is held at process level and shared by every
+session, and only the current version is kept, so an ingest or a new
+CSV releases the previous frame; ``load_orders`` hands out shallow copies,
+which under pandas' copy-on-write behave as private frames without
+duplicating any data.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.metrics import cached_call
+
+DATA_PATH = Path("Auto Sales data Cleaned.csv")
+CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", ".dashboard_cache"))
+DATE_FORMAT = "%d-%m-%Y"
+DELTA_DIR = CACHE_DIR / "deltas"
+CATEGORICAL_COLUMNS = [
+    "PRODUCTLINE", "CUSTOMERNAME", "PURCHASE_CATEGORY", "STATUS", "PRODUCTCODE", "CITY", "COUNTRY",
+    "CONTACTLASTNAME", "CONTACTFIRSTNAME", "DEALSIZE",
+]
+INTEGER_COLUMNS = ["ORDERNUMBER", "QUANTITYORDERED", "ORDERLINENUMBER", "DAYS_SINCE_LASTORDER", "MSRP"]
+# Bumped whenever the prepared layout changes, so older sidecars are re-parsed
+PREPARED_FORMAT = 2
+
+
+def source_version(path=DATA_PATH) -> str:
+    """Fingerprint of the source file, built from its path, mtime and size."""
+    stat = os.stat(path)
+    key = f"{Path(path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def delta_dir(path=DATA_PATH) -> Path:
+    """Directory of delta parts ingested on top of this version of the CSV.
+
+    Replacing the CSV changes its version, which retires the old deltas.
+    """
+    return DELTA_DIR / f"{Path(path).stem}.{source_version(path)}"
+
+
+def delta_parts(path=DATA_PATH) -> tuple:
+    """Ingested delta part files, oldest first."""
+    return tuple(str(part) for part in sorted(delta_dir(path).glob("part-*.parquet")))
+
+
+def data_version(path=DATA_PATH) -> str:
+    """Fingerprint of the full dataset: the source file plus ingested deltas."""
+    parts = delta_parts(path)
+    if not parts:
+        return source_version(path)
+    key = "|".join((source_version(path),) + tuple(Path(part).name for part in parts))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def prepare_orders(df: pd.DataFrame, downcast: bool = False) -> pd.DataFrame:
+    """Add the typed and derived columns every dashboard panel relies on.
+
+    ``downcast`` shrinks the integer columns to fit their values; only for
+    a whole frame, never for one chunk of a stream.
+    """
+    df.columns = df.columns.str.strip()
+    if not pd.api.types.is_datetime64_any_dtype(df["ORDERDATE"]):
+        df["ORDERDATE"] = pd.to_datetime(df["ORDERDATE"], format=DATE_FORMAT)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast="integer" if downcast else None)
+    df["EST_PROFIT"] = (df["MSRP"] - df["PRICEEACH"]) * df["QUANTITYORDERED"]
+    df["MONTH"] = df["ORDERDATE"].dt.to_period("M")
+    return df
+
+
+def read_orders_csv(source) -> pd.DataFrame:
+    """Parse an orders CSV (path or file object) into the prepared layout."""
+    # Text columns are parsed straight into categoricals, never held as strings
+    raw = pd.read_csv(source, parse_dates=["ORDERDATE"], date_format=DATE_FORMAT,
+                      dtype=dict.fromkeys(CATEGORICAL_COLUMNS, "category"))
+    return prepare_orders(raw, downcast=True)
+
+
+def _sidecar_path(path: Path, version: str) -> Path:
+    return CACHE_DIR / f"{path.stem}.{version}.v{PREPARED_FORMAT}.parquet"
+
+
+def write_parquet_cache(df: pd.DataFrame, target: Path, stale_glob: str = None) -> bool:
+    """Atomically write a cache file, then drop siblings matching ``stale_glob``.
+
+    Returns False when the cache can't be written (no Parquet engine or a
+    read-only cache dir); callers keep working from the uncached data.
+    """
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+    except (ImportError, OSError):
+        return False
+    if stale_glob:
+        for stale in target.parent.glob(stale_glob):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+    return True
+
+
+# One entry: only the current version of the data stays resident
+@lru_cache(maxsize=1)
+def _load_prepared(path: str, version: str) -> pd.DataFrame:
+    path = Path(path)
+    sidecar = _sidecar_path(path, version)
+    if sidecar.exists():
+        try:
+            return pd.read_parquet(sidecar, memory_map=True)
+        except (ImportError, OSError, ValueError):
+            pass
+    df = read_orders_csv(path)
+    # Drop sidecars written for older versions of the same file
+    write_parquet_cache(df, sidecar, stale_glob=f"{path.stem}.*.parquet")
+    return df
+
+
+def _restore_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    # Concatenating categoricals with different categories falls back to object
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+@lru_cache(maxsize=1)
+def _load_with_deltas(path: str, version: str, parts: tuple) -> pd.DataFrame:
+    base = _load_prepared(path, version)
+    if not parts:
+        return base
+    frames = [base] + [pd.read_parquet(part) for part in parts]
+    combined = _restore_categoricals(pd.concat(frames, ignore_index=True))
+    # The combined frame copies the base, so don't keep both resident
+    _load_prepared.cache_clear()
+    return combined
+
+
+def load_orders(path=DATA_PATH) -> pd.DataFrame:
+    """Return the prepared order table, parsing the CSV only when it changed.
+
+    The frame shares its data with the process-wide cached one; writes to
+    it copy only the columns they touch.
+    """
+    return cached_call("data.load_orders", _load_with_deltas,
+                       str(path), source_version(path), delta_parts(path)).copy(deep=False)
@@ -0,0 +1,134 @@
+"""Background process pool for forecast and report jobs.
+
+Forecasts and PDF reports run off the Streamlit script thread so the page
+can render everything else first. The pool and the in-flight table live at module
+level, so every session in the server process shares them: concurrent
+requests for the same series and model attach to one running job.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from dashboard.forecasting import forecast_with, get_forecaster
+from dashboard.registry import group_key, series_key
+
+MAX_WORKERS = int(os.environ.get("DASHBOARD_FORECAST_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_executor = None
+_inflight = {}
+_lock = threading.Lock()
+
+
+def _mp_context():
+    # Workers must not fork a parent that may hold TF/BLAS threads
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["dashboard.forecasting"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=_mp_context())
+    return _executor
+
+
+@contextmanager
+def _script_main_hidden():
+    """Stop new workers from re-running the Streamlit script.
+
+    Streamlit installs the page script as ``__main__``, and non-fork start
+    methods re-import ``__main__`` in every new worker.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _submit(fn, *args) -> Future:
+    with _script_main_hidden():
+        return get_executor().submit(fn, *args)
+
+
+def _reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def submit_job(fn, *args) -> Future:
+    """Run ``fn(*args)`` in the shared pool, restarting a broken pool once."""
+    try:
+        return _submit(fn, *args)
+    except BrokenProcessPool:
+        _reset_executor()
+        return _submit(fn, *args)
+
+
+def _forecast_within(kind: str, series: pd.Series, timeout: float = None, companions=()) -> float:
+    """Worker side of ``submit_forecast``: abandon the fit after ``timeout``
+    seconds, freeing the worker for the next job.
+    """
+    if timeout is None or not hasattr(signal, "setitimer"):
+        return forecast_with(kind, series, companions)
+
+    def expired(signum, frame):
+        raise TimeoutError(f"{kind} forecast of {series.name} took longer than {timeout}s")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return forecast_with(kind, series, companions)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def submit_forecast(kind: str, series: pd.Series, timeout: float = None, companions=()) -> Future:
+    """Return a future for the next-month ``kind`` forecast of ``series``.
+
+    Registry hits resolve immediately without touching the pool. With
+    ``timeout``, the job fails with ``TimeoutError`` once the fit has run
+    that many seconds. Shared-model backends also train on ``companions``.
+    """
+    forecaster = get_forecaster(kind)
+    companions = tuple(companions) if forecaster.shared_model else ()
+    if companions:
+        cached = forecaster.cached_many([series, *companions])
+        cached = None if cached is None else cached[0]
+        key = group_key([series, *companions], forecaster.config())
+    else:
+        cached = forecaster.cached(series)
+        key = series_key(series, forecaster.config())
+    if cached is not None:
+        done = Future()
+        done.set_result(cached)
+        return done
+
+    with _lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = submit_job(_forecast_within, kind, series, timeout, companions)
+        _inflight[key] = future
+    future.add_done_callback(lambda _: _forget(key))
+    return future
+
+
+def _forget(key: str):
+    with _lock:
+        _inflight.pop(key, None)
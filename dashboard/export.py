@@ -0,0 +1,125 @@
+"""On-demand raw-data exports.
+
+Exports are written chunk by chunk from a data backend's row stream
+(``DataBackend.iter_orders``) to a temporary file and then renamed
+into ``CACHE_DIR/exports``. Each file is named after the data version,
+format and scope (export options plus the sidebar filters), so repeated
+downloads of the same slice read the finished file instead of
+serializing the frame again.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.data import CACHE_DIR
+from dashboard.metrics import span
+
+EXPORT_DIR = CACHE_DIR / "exports"
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def scope_mask(df: pd.DataFrame, months=None, productlines=None, filters=None) -> pd.Series:
+    """Boolean row mask for an export scope; ``None`` means no restriction.
+
+    ``filters`` is the sidebar's ``Filters`` state, applied on top.
+    """
+    mask = pd.Series(True, index=df.index) if filters is None else filters.mask(df)
+    if months is not None:
+        mask &= df["MONTH"].isin(months)
+    if productlines is not None:
+        mask &= df["PRODUCTLINE"].isin(productlines)
+    return mask
+
+
+def export_path(version: str, fmt: str, months=None, productlines=None, filters=None) -> Path:
+    scope = json.dumps(
+        {
+            "months": None if months is None else sorted(map(str, months)),
+            "productlines": None if productlines is None else sorted(map(str, productlines)),
+            "filters": None if filters is None or not filters.active() else filters.key(),
+        },
+        sort_keys=True,
+    )
+    scope_key = hashlib.sha1(scope.encode()).hexdigest()[:12]
+    return EXPORT_DIR / f"orders-{version}-{scope_key}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def _write_csv_gz(chunks, tmp: Path):
+    with gzip.open(tmp, "wt", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=i == 0, index=False)
+
+
+def _widened(schema):
+    """``schema`` with every integer field as int64 and float field as float64."""
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        if pa.types.is_integer(field.type):
+            field = field.with_type(pa.int64())
+        elif pa.types.is_floating(field.type):
+            field = field.with_type(pa.float64())
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _write_parquet(chunks, tmp: Path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            # Chunks carry their own category sets, so write categoricals as plain values
+            chunk = chunk.astype({col: chunk[col].cat.categories.dtype
+                                  for col in chunk.select_dtypes("category").columns})
+            if writer is None:
+                # Fixed, widened types, so chunks with narrower (or wider) numbers still fit
+                schema = _widened(pa.Schema.from_pandas(chunk, preserve_index=False))
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"csv.gz": _write_csv_gz, "parquet": _write_parquet}
+
+
+def export_orders(backend, fmt: str = "csv.gz", months=None, productlines=None, filters=None) -> Path:
+    """Write (or reuse) the export for the backend's data version, format and scope."""
+    if filters is not None and not filters.active():
+        filters = None
+    with span(f"export.{fmt}") as s:
+        version = backend.version()
+        path = export_path(version, fmt, months, productlines, filters)
+        s.set(cache="hit" if path.exists() else "miss")
+        if path.exists():
+            return path
+
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        chunks = (chunk[scope_mask(chunk, months, productlines, filters)] for chunk in backend.iter_orders())
+        fd, tmp = tempfile.mkstemp(dir=EXPORT_DIR, suffix=".tmp")
+        os.close(fd)
+        try:
+            WRITERS[fmt](chunks, Path(tmp))
+            os.replace(tmp, path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+    # Exports for older data versions will never be served again
+    for stale in EXPORT_DIR.glob("orders-*"):
+        if not stale.name.startswith(f"orders-{version}-"):
+            stale.unlink(missing_ok=True)
+    return path
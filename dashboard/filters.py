@@ -0,0 +1,218 @@
+"""Index-backed dashboard filters.
+
+The sidebar filters narrow every panel to an order-date range and to
+chosen product lines, customers and purchase categories. Rather than
+rescanning the data on every widget change, a ``FilterIndex`` is built
+once per data version:
+
+- row positions sorted by date, so a date range is two binary searches
+  and a slice;
+- per-value row-position arrays for each filterable column.
+
+Applying filters slices or concatenates those arrays and intersects them
+smallest first by binary search, so the cost follows the number of
+selected rows. The pandas backend indexes its order lines (day
+precision); out-of-core backends index their cube (month precision).
+``FilteredBackend`` serves the cube of the selected rows through the
+usual backend queries, so the KPI snapshot and every panel built from it
+respect the filters.
+"""
+import hashlib
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dashboard.aggregates import build_monthly_cube
+from dashboard.backends import DataBackend, PandasBackend, get_backend
+from dashboard.data import _load_with_deltas, delta_parts, source_version
+from dashboard.kpis import compute_snapshot, current_snapshot
+from dashboard.metrics import cached_call, span
+
+# Filter field -> indexed column
+FILTER_COLUMNS = {"productlines": "PRODUCTLINE", "customers": "CUSTOMERNAME", "categories": "PURCHASE_CATEGORY"}
+
+_EMPTY = np.empty(0, dtype="int64")
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Sidebar filter state. ``None`` dates and empty tuples select everything."""
+
+    start: date = None
+    end: date = None
+    productlines: tuple = ()
+    customers: tuple = ()
+    categories: tuple = ()
+
+    def active(self) -> bool:
+        return any(getattr(self, field.name) for field in fields(self))
+
+    def key(self) -> str:
+        return hashlib.sha1(repr(self).encode()).hexdigest()[:12]
+
+    def mask(self, orders: pd.DataFrame) -> pd.Series:
+        """Boolean mask of the prepared order rows matching every active filter.
+
+        The row-by-row counterpart of ``FilterIndex.select``, for streamed
+        rows that have no index (e.g. exports).
+        """
+        mask = pd.Series(True, index=orders.index)
+        if self.start is not None:
+            mask &= orders["ORDERDATE"] >= pd.Timestamp(self.start)
+        if self.end is not None:
+            mask &= orders["ORDERDATE"] < pd.Timestamp(self.end + timedelta(days=1))
+        for field, column in FILTER_COLUMNS.items():
+            values = getattr(self, field)
+            if values:
+                mask &= orders[column].astype(str).isin(values)
+        return mask
+
+
+def _intersect(selected: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Positions in both sorted arrays, at O(len(selected) * log(len(other)))."""
+    if not len(selected) or not len(other):
+        return _EMPTY
+    found = np.searchsorted(other, selected).clip(max=len(other) - 1)
+    return selected[other[found] == selected]
+
+
+class FilterIndex:
+    """Date and per-value row-position indexes over one frame.
+
+    ``frame`` is either prepared order lines (``date_column="ORDERDATE"``)
+    or a monthly cube (``date_column="MONTH"``).
+    """
+
+    def __init__(self, frame: pd.DataFrame, date_column: str):
+        self.frame = frame
+        self.monthly = date_column == "MONTH"
+        stamps = frame[date_column].dt.start_time if self.monthly else frame[date_column]
+        dates = stamps.to_numpy(dtype="datetime64[ns]")
+        self.by_date = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.by_date]
+        self.positions = {
+            column: {str(value): positions.astype("int64")
+                     for value, positions in frame.groupby(column, observed=True).indices.items()}
+            for column in FILTER_COLUMNS.values()
+        }
+
+    def values(self, column: str) -> list:
+        return sorted(self.positions[column])
+
+    def date_bounds(self):
+        """First and last date (month start for a cube) as ``date`` objects."""
+        if not len(self.sorted_dates):
+            return None, None
+        first, last = pd.Timestamp(self.sorted_dates[0]), pd.Timestamp(self.sorted_dates[-1])
+        if self.monthly:
+            last = last + pd.offsets.MonthEnd(0)
+        return first.date(), last.date()
+
+    def _date_range(self, start, end) -> np.ndarray:
+        lo, hi = 0, len(self.sorted_dates)
+        if start is not None:
+            if self.monthly:
+                start = start.replace(day=1)
+            lo = np.searchsorted(self.sorted_dates, np.datetime64(start, "ns"), side="left")
+        if end is not None:
+            hi = np.searchsorted(self.sorted_dates, np.datetime64(end + timedelta(days=1), "ns"), side="left")
+        return np.sort(self.by_date[lo:hi])
+
+    def select(self, filters: Filters) -> np.ndarray:
+        """Sorted row positions matching every active filter."""
+        selections = []
+        if filters.start is not None or filters.end is not None:
+            selections.append(self._date_range(filters.start, filters.end))
+        for field, column in FILTER_COLUMNS.items():
+            values = getattr(filters, field)
+            if values:
+                # Each value's positions are sorted and disjoint from the others'
+                parts = [self.positions[column].get(value, _EMPTY) for value in values]
+                selections.append(np.sort(np.concatenate(parts)))
+        if not selections:
+            return np.arange(len(self.frame))
+        selections.sort(key=len)
+        selected = selections[0]
+        for other in selections[1:]:
+            selected = _intersect(selected, other)
+        return selected
+
+    def cube(self, filters: Filters) -> pd.DataFrame:
+        """The monthly cube of the rows matching ``filters``."""
+        rows = self.frame.take(self.select(filters))
+        if self.monthly:
+            return rows.reset_index(drop=True)
+        return build_monthly_cube(rows)
+
+
+# The pandas index holds the order frame, so keep only the current version's
+@lru_cache(maxsize=1)
+def _filter_index(backend_name: str, path: str, version: str) -> FilterIndex:
+    backend = get_backend(backend_name, path)
+    if isinstance(backend, PandasBackend):
+        # The cached prepared frame is shared read-only; selections take() from it
+        return FilterIndex(_load_with_deltas(path, source_version(path), delta_parts(path)), "ORDERDATE")
+    return FilterIndex(backend.cube(), "MONTH")
+
+
+def filter_index(backend: DataBackend) -> FilterIndex:
+    """The filter index for the backend's current data version."""
+    return cached_call("filters.index", _filter_index, backend.name, str(backend.path), backend.version())
+
+
+@lru_cache(maxsize=32)
+def _filtered_cube(backend_name: str, path: str, version: str, filters: Filters) -> pd.DataFrame:
+    index = _filter_index(backend_name, path, version)
+    with span("filters.select", **{field: len(getattr(filters, field)) for field in FILTER_COLUMNS}) as s:
+        cube = index.cube(filters)
+        s.set(cells=len(cube))
+    return cube
+
+
+class FilteredBackend(DataBackend):
+    """A backend's data narrowed to ``filters``; queries run on the filtered cube."""
+
+    def __init__(self, backend: DataBackend, filters: Filters):
+        super().__init__(backend.path)
+        self.base = backend
+        self.name = backend.name
+        self.filters = filters
+
+    def version(self) -> str:
+        return f"{self.base.version()}-f{self.filters.key()}"
+
+    def cube(self) -> pd.DataFrame:
+        return cached_call("data.filtered_cube", _filtered_cube,
+                           self.base.name, str(self.path), self.base.version(), self.filters)
+
+    def monthly_revenue(self) -> pd.Series:
+        # Named apart from the unfiltered series, so ARIMA updates don't mix the two
+        return super().monthly_revenue().rename(f"SALES[filter={self.filters.key()}]")
+
+
+def filtered_backend(backend: DataBackend, filters: Filters) -> DataBackend:
+    """``backend`` itself when no filter is active, else a ``FilteredBackend``."""
+    return FilteredBackend(backend, filters) if filters.active() else backend
+
+
+@lru_cache(maxsize=32)
+def _filtered_snapshot(backend_name: str, path: str, version: str, filters: Filters):
+    backend = FilteredBackend(get_backend(backend_name, path), filters)
+    if backend.cube().empty:
+        return None
+    return compute_snapshot(backend, forecasts=False)
+
+
+def filtered_snapshot(backend: DataBackend, filters: Filters):
+    """The KPI snapshot of the filtered data, or None when no order matches.
+
+    Without active filters this is the backend's stored snapshot.
+    """
+    if not filters.active():
+        return current_snapshot(backend)
+    with span("kpis.snapshot", filtered=True):
+        return cached_call("kpis.filtered_snapshot", _filtered_snapshot,
+                           backend.name, str(backend.path), backend.version(), filters)
@@ -0,0 +1,251 @@
+"""Pluggable next-month forecaster backends.
+
+Each backend imports its heavy library (statsmodels, TensorFlow,
+scikit-learn) on first use only, so processes that never forecast with a
+backend never pay for its import. Which backends are available is set
+per deployment with ``DASHBOARD_FORECASTERS`` (comma-separated names).
+Fitted models and their forecasts are kept in the on-disk model registry.
+Backends with a ``shared_model`` (the LSTM) train one model per call of
+``forecast_many`` across all the series passed in.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from dashboard.metrics import span
+from dashboard.registry import default_registry, group_key, series_key, stream_key
+
+ARIMA_ORDER = (1, 1, 1)
+LSTM_UNITS = 50
+LSTM_EPOCHS = 200
+LSTM_BATCH_SIZE = 32
+LSTM_LOOKBACK = 3
+# Epochs without improvement before training stops early
+LSTM_PATIENCE = 20
+# Incremental ARIMA updates reuse the fitted parameters; refit after this many
+ARIMA_MAX_UPDATES = 12
+
+
+class Forecaster:
+    """Base class: subclasses implement ``config`` and ``fit_predict``."""
+
+    name = ""
+    # Cheap models are refit every time rather than written to the registry
+    cacheable = True
+    # One model trained across several series (see ``forecast_many``)
+    shared_model = False
+
+    def config(self) -> dict:
+        raise NotImplementedError
+
+    def fit_predict(self, series: pd.Series):
+        """Fit on ``series`` and return ``(forecast, write_artifacts)``."""
+        raise NotImplementedError
+
+    def cached(self, series: pd.Series, registry=None):
+        """Return the registry's forecast for ``series``, or None."""
+        if not self.cacheable:
+            return None
+        registry = registry or default_registry()
+        entry = registry.get(series_key(series, self.config()))
+        return None if entry is None else entry["forecast"]
+
+    def cached_many(self, series_list, registry=None):
+        """Return the registry's forecasts for ``series_list``, or None."""
+        forecasts = [self.cached(series, registry) for series in series_list]
+        return None if any(forecast is None for forecast in forecasts) else forecasts
+
+    def forecast_many(self, series_list, registry=None) -> list:
+        """Forecast the next value of each series."""
+        return [self.forecast(series, registry) for series in series_list]
+
+    def forecast(self, series: pd.Series, registry=None) -> float:
+        """Forecast the next value of ``series``, reusing a cached fit."""
+        with span(f"forecast.{self.name}") as s:
+            if not self.cacheable:
+                return self.fit_predict(series)[0]
+            registry = registry or default_registry()
+            key = series_key(series, self.config())
+            entry = registry.get(key)
+            s.set(cache="miss" if entry is None else "hit")
+            if entry is not None:
+                return entry["forecast"]
+            forecast, write_artifacts = self.fit_predict(series)
+            registry.put(key, {"forecast": forecast}, write_artifacts)
+            return forecast
+
+
+class ArimaForecaster(Forecaster):
+    name = "arima"
+
+    def __init__(self, order=ARIMA_ORDER):
+        self.order = tuple(order)
+
+    def config(self) -> dict:
+        return {"model": self.name, "order": list(self.order)}
+
+    def fit_predict(self, series):
+        from statsmodels.tsa.arima.model import ARIMA
+
+        with span("forecast.arima.fit"):
+            model_fit = ARIMA(series, order=self.order).fit()
+        forecast = float(model_fit.forecast(steps=1).iloc[0])
+        return forecast, lambda d: model_fit.save(d / "arima.pkl")
+
+    def forecast(self, series, registry=None) -> float:
+        """Like ``Forecaster.forecast``, but a miss first tries to update the
+        stream's previous fit with the new observations before refitting.
+        """
+        with span(f"forecast.{self.name}") as s:
+            registry = registry or default_registry()
+            key = series_key(series, self.config())
+            entry = registry.get(key)
+            if entry is not None:
+                s.set(cache="hit")
+                return entry["forecast"]
+
+            stream = stream_key(str(series.name), self.config())
+            model_fit, updates = self._update_previous(series, registry, stream)
+            if model_fit is None:
+                s.set(cache="miss")
+                forecast, write_artifacts = self.fit_predict(series)
+                updates = 0
+            else:
+                # Not a refit, but not a cached answer either
+                s.set(cache="update")
+                forecast = float(model_fit.forecast(steps=1).iloc[0])
+                write_artifacts = lambda d: model_fit.save(d / "arima.pkl")
+            meta = {
+                "forecast": forecast,
+                "index": [str(label) for label in series.index],
+                "values": [float(value) for value in series.values],
+                "updates": updates,
+            }
+            registry.put(key, meta, write_artifacts)
+            registry.set_head(stream, key)
+            return forecast
+
+    def _update_previous(self, series, registry, stream):
+        """Return ``(results, updates)`` carried forward from the stream head,
+        or ``(None, 0)`` when the history no longer lines up.
+        """
+        head = registry.head(stream)
+        if head is None:
+            return None, 0
+        key, meta = head
+        if "index" not in meta or meta.get("updates", 0) >= ARIMA_MAX_UPDATES:
+            return None, 0
+        n = len(meta["index"])
+        if n > len(series) or [str(label) for label in series.index[:n]] != meta["index"]:
+            return None, 0
+
+        from statsmodels.tsa.arima.model import ARIMAResults
+
+        try:
+            model_fit = ARIMAResults.load(registry.entry_dir(key) / "arima.pkl")
+        except (OSError, ValueError):
+            return None, 0
+        if np.allclose(series.values[:n], meta["values"]):
+            if n == len(series):
+                # Same history up to float noise (e.g. another summation order)
+                return model_fit, meta.get("updates", 0)
+            # Pure extension: filter the new months through the existing state
+            model_fit = model_fit.append(series.iloc[n:], refit=False)
+        else:
+            # Revised history (e.g. a partial month grew): reapply the fitted
+            # parameters to the whole series without re-estimating them
+            model_fit = model_fit.apply(series, refit=False)
+        return model_fit, meta.get("updates", 0) + 1
+
+
+class LstmForecaster(Forecaster):
+    name = "lstm"
+    shared_model = True
+
+    def __init__(self, units=LSTM_UNITS, epochs=LSTM_EPOCHS, batch_size=LSTM_BATCH_SIZE,
+                 lookback=LSTM_LOOKBACK, patience=LSTM_PATIENCE):
+        self.units = units
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.lookback = lookback
+        self.patience = patience
+
+    def config(self) -> dict:
+        return {"model": self.name, "units": self.units, "epochs": self.epochs, "batch_size": self.batch_size,
+                "lookback": self.lookback, "patience": self.patience}
+
+    def fit_predict_many(self, series_list):
+        """Train one model on all series; return ``(forecasts, write_artifacts)``."""
+        from dashboard.lstm import train_and_forecast
+
+        with span("forecast.lstm.fit", series=len(series_list)):
+            forecasts, model = train_and_forecast(
+                [series.to_numpy(dtype="float64") for series in series_list],
+                lookback=self.lookback, units=self.units, epochs=self.epochs,
+                batch_size=self.batch_size, patience=self.patience,
+            )
+        write_artifacts = None if model is None else lambda d: model.save_weights(d / "lstm.weights.h5")
+        return forecasts, write_artifacts
+
+    def fit_predict(self, series):
+        forecasts, write_artifacts = self.fit_predict_many([series])
+        return forecasts[0], write_artifacts
+
+    def cached_many(self, series_list, registry=None):
+        registry = registry or default_registry()
+        entry = registry.get(group_key(series_list, self.config()))
+        return None if entry is None else entry["forecasts"]
+
+    def forecast_many(self, series_list, registry=None) -> list:
+        with span(f"forecast.{self.name}") as s:
+            registry = registry or default_registry()
+            key = group_key(series_list, self.config())
+            entry = registry.get(key)
+            s.set(cache="miss" if entry is None else "hit")
+            if entry is not None:
+                return entry["forecasts"]
+            forecasts, write_artifacts = self.fit_predict_many(series_list)
+            registry.put(key, {"forecasts": forecasts}, write_artifacts)
+            return forecasts
+
+
+class LinearTrendForecaster(Forecaster):
+    name = "linear"
+    cacheable = False
+
+    def config(self) -> dict:
+        return {"model": self.name}
+
+    def fit_predict(self, series):
+        from sklearn.linear_model import LinearRegression
+
+        X = np.arange(len(series)).reshape(-1, 1)
+        model = LinearRegression().fit(X, np.asarray(series.values, dtype=float))
+        return float(model.predict([[len(series)]])[0]), None
+
+
+BACKENDS = {backend.name: backend for backend in (ArimaForecaster, LstmForecaster, LinearTrendForecaster)}
+
+
+def enabled_backends() -> list:
+    """Backend names enabled for this deployment (all of them by default)."""
+    names = os.environ.get("DASHBOARD_FORECASTERS", ",".join(BACKENDS))
+    return [name.strip() for name in names.split(",") if name.strip() in BACKENDS]
+
+
+def get_forecaster(name: str) -> Forecaster:
+    if name not in enabled_backends():
+        raise ValueError(f"Forecaster backend {name!r} is not enabled (DASHBOARD_FORECASTERS)")
+    return BACKENDS[name]()
+
+
+def forecast_with(name: str, series: pd.Series, companions=()) -> float:
+    """Forecast the next value of ``series`` with the named backend. A
+    shared-model backend also trains on ``companions`` (related series, e.g.
+    profit and per-product-line sales).
+    """
+    forecaster = get_forecaster(name)
+    if companions and forecaster.shared_model:
+        return forecaster.forecast_many([series, *companions])[0]
+    return forecaster.forecast(series)
@@ -0,0 +1,162 @@
+"""The dashboard's computations as a graph of memoized nodes.
+
+Each ``Node`` declares its inputs (other nodes) and the run parameters it
+reads (backend, data version, filters, panel options). Every computed
+value gets a stamp, and a node's cache key is its own parameters plus its
+inputs' stamps. A changed parameter therefore invalidates exactly the
+nodes downstream of it, and so does an upstream value that is recomputed
+(e.g. after failing its validity check):
+
+    data version, filters -> view -> cube -> segment forecasts -> tables -> figures
+                          -> snapshot -> revenue forecasts
+                                      -> waterfall / cash burn figures
+
+Values are kept in a process-wide LRU shared by every session. A panel
+asks for the node it draws, e.g. ``cash_burn_bar(params)``; everything it
+needs is computed on a miss, or served from the cache otherwise.
+Values must be treated as read-only.
+"""
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+
+from dashboard import charts
+from dashboard.backends import get_backend
+from dashboard.backtest import start_backtest
+from dashboard.executor import submit_forecast
+from dashboard.filters import filtered_backend, filtered_snapshot
+from dashboard.forecasting import enabled_backends
+from dashboard.kpis import REVENUE_MODELS, forecast_companions, scope_snapshots
+from dashboard.metrics import span
+from dashboard.segments import SegmentForecasts
+
+NODE_CACHE_SIZE = 256
+
+# key -> (value, stamp)
+_values = OrderedDict()
+_values_lock = threading.Lock()
+_stamps = itertools.count()
+
+# Parameters that identify the dataset a run works on
+DATA_PARAMS = ("backend", "path", "version")
+
+
+class Node:
+    """A memoized ``fn(**inputs, **params)``.
+
+    ``valid(value)`` may reject a cached value (e.g. one holding a job
+    lost with its pool), which is then recomputed.
+    """
+
+    def __init__(self, name: str, fn, inputs=(), params=(), valid=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.params = tuple(params)
+        self.valid = valid
+
+    def resolve(self, params: dict) -> tuple:
+        """``(value, stamp)``, resolving (and re-validating) the inputs first."""
+        inputs = {node.name: node.resolve(params) for node in self.inputs}
+        key = (self.name, tuple(params[name] for name in self.params),
+               tuple(stamp for _, stamp in inputs.values()))
+        with span(f"node.{self.name}") as s:
+            with _values_lock:
+                entry = _values.get(key)
+                if entry is not None:
+                    _values.move_to_end(key)
+            if entry is not None and (self.valid is None or self.valid(entry[0])):
+                s.set(cache="hit")
+                return entry
+            s.set(cache="miss")
+            value = self.fn(**{name: value for name, (value, _) in inputs.items()},
+                            **{name: params[name] for name in self.params})
+            entry = (value, next(_stamps))
+            with _values_lock:
+                _values[key] = entry
+                while len(_values) > NODE_CACHE_SIZE:
+                    _values.popitem(last=False)
+            return entry
+
+    def __call__(self, params: dict):
+        return self.resolve(params)[0]
+
+
+def _jobs_intact(futures) -> bool:
+    """False if a job was cancelled or lost with a broken pool.
+
+    Fits that failed or timed out are final for this data (the tables and
+    cards show their fallbacks), so they stay cached rather than being
+    resubmitted on every rerun; new data gives the node a new key anyway.
+    """
+    for future in futures:
+        if future.cancelled():
+            return False
+        if future.done() and isinstance(future.exception(), BrokenProcessPool):
+            return False
+    return True
+
+
+# === Data ===
+
+view = Node("view", lambda backend, path, version, filters: filtered_backend(get_backend(backend, path), filters),
+            params=DATA_PARAMS + ("filters",))
+snapshot = Node("snapshot",
+                lambda backend, path, version, filters: filtered_snapshot(get_backend(backend, path), filters),
+                params=DATA_PARAMS + ("filters",))
+cube = Node("cube", lambda view: view.cube(), inputs=[view])
+monthly_revenue = Node("monthly_revenue", lambda view: view.monthly_revenue(), inputs=[view])
+companions = Node("companions", lambda cube: forecast_companions(cube), inputs=[cube])
+
+
+# === Forecasts (futures from the process pool) ===
+
+def _revenue_forecasts(snapshot, monthly_revenue, companions) -> dict:
+    """Model -> Future; models the snapshot already answers are done at once."""
+    from concurrent.futures import Future
+
+    futures = {}
+    for model, kind in REVENUE_MODELS.items():
+        if snapshot["forecasts"].get(model) is not None:
+            futures[model] = Future()
+            futures[model].set_result(snapshot["forecasts"][model])
+        elif kind in enabled_backends():
+            futures[model] = submit_forecast(kind, monthly_revenue, companions=companions)
+    return futures
+
+
+revenue_forecasts = Node("revenue_forecasts", _revenue_forecasts, inputs=[snapshot, monthly_revenue, companions],
+                         valid=lambda futures: _jobs_intact(futures.values()))
+segment_forecasts = Node("segment_forecasts",
+                         lambda cube, by, measure, model: SegmentForecasts(cube, by, measure, model),
+                         inputs=[cube], params=("by", "measure", "model"),
+                         valid=lambda forecasts: _jobs_intact(forecasts.futures))
+# Blocks until the segment's jobs are done
+segment_table = Node("segment_table", lambda segment_forecasts: segment_forecasts.result(), inputs=[segment_forecasts])
+backtest = Node("backtest", lambda backend, path, version: start_backtest(get_backend(backend, path)),
+                params=DATA_PARAMS)
+scoped_snapshots = Node("scoped_snapshots",
+                        lambda cube, snapshot, scope: scope_snapshots(cube, scope, snapshot["data_version"]),
+                        inputs=[cube, snapshot], params=("scope",))
+
+
+# === Figures ===
+
+waterfall = Node("waterfall", lambda snapshot: charts.waterfall(snapshot["profit_walk"]), inputs=[snapshot])
+cash_burn_line = Node(
+    "cash_burn_line",
+    lambda snapshot, burn_by: charts.cash_burn_line(snapshot["cash_burn"][burn_by]["monthly"],
+                                                    "Cash Burn (Last 3 Months)"),
+    inputs=[snapshot], params=("burn_by",),
+)
+cash_burn_bar = Node(
+    "cash_burn_bar",
+    lambda snapshot, burn_by: charts.cash_burn_bars(snapshot["cash_burn"][burn_by]["trend"],
+                                                    snapshot["cash_burn"][burn_by]["groups"], burn_by),
+    inputs=[snapshot], params=("burn_by",),
+)
+inventory_bars = Node("inventory_bars", lambda segment_table: charts.inventory_bars(segment_table),
+                      inputs=[segment_table])
+forecast_pie = Node("forecast_pie", lambda segment_table, by, label: charts.forecast_pie(segment_table, by, label),
+                    inputs=[segment_table], params=("by", "label"))
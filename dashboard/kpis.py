@@ -0,0 +1,248 @@
+"""Headless KPI snapshot.
+
+Computes the figures behind the dashboard's KPI cards, profit waterfall,
+inventory-risk and cash-burn panels from a data backend, without
+Streamlit. A snapshot is a plain JSON document stamped with the data
+version it was computed from. ``python -m dashboard snapshot`` writes one
+(e.g. from a nightly job) into ``SNAPSHOT_DIR``, and the dashboard loads
+it for as long as the data is unchanged instead of recomputing it.
+"""
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.aggregates import last_months, rollup
+from dashboard.data import CACHE_DIR
+from dashboard.forecasting import enabled_backends, forecast_with
+from dashboard.metrics import span
+from dashboard.trends import linear_trend_forecast
+
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+# Bumped whenever the snapshot layout changes, so older files are ignored
+SNAPSHOT_FORMAT = 2
+
+WINDOW_MONTHS = 3
+REVENUE_MODELS = {"ARIMA": "arima", "LSTM": "lstm"}
+BURN_GROUPS = ["PURCHASE_CATEGORY", "PRODUCTLINE"]
+SCOPE_COLUMNS = ["PRODUCTLINE", "MONTH", "PURCHASE_CATEGORY"]
+# Product lines selling less than this over the window are flagged as at risk
+STOCK_RISK_SALES = 10000
+
+
+def _records(df: pd.DataFrame) -> list:
+    """JSON-ready rows, with Periods and categories as strings."""
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, (pd.PeriodDtype, pd.CategoricalDtype)):
+            df[column] = df[column].astype(str)
+    return json.loads(df.to_json(orient="records"))
+
+
+def revenue_kpis(monthly_rev: pd.Series, months: list) -> dict:
+    """Overall, latest-month and window growth figures for the KPI cards."""
+    latest_month = monthly_rev.index.max()
+    # Months of the window without orders count as zero revenue
+    rev_window = monthly_rev.reindex(months, fill_value=0.0)
+    growth_rate = (
+        (rev_window.iloc[-1] - rev_window.iloc[0]) / rev_window.iloc[0] * 100
+        if len(rev_window) == WINDOW_MONTHS and rev_window.iloc[0] else 0.0
+    )
+    return {
+        "total_revenue": float(monthly_rev.sum()),
+        "latest_month": str(latest_month),
+        "latest_month_revenue": float(monthly_rev[latest_month]),
+        "growth_rate": float(growth_rate),
+        "predicted_month": str(latest_month + 1),
+    }
+
+
+def order_status(cube: pd.DataFrame) -> dict:
+    """Order lines shipped vs. in any other status."""
+    shipped = int(cube["SHIPPED_LINES"].sum())
+    return {"shipped": shipped, "not_shipped": int(cube["ORDER_LINES"].sum()) - shipped}
+
+
+def profit_walk(cube: pd.DataFrame, months: list) -> pd.DataFrame:
+    """Sales, gross and net profit per month of the window, zero for months without orders."""
+    walk = rollup(cube, "MONTH", months, ["SALES", "GROSS_PROFIT", "NET_PROFIT"])
+    return walk.reindex(pd.PeriodIndex(months, freq="M", name="MONTH"), fill_value=0.0).reset_index()
+
+
+def inventory_risk(backend, months: list) -> pd.DataFrame:
+    """Per-product-line sales over the window with a stock-risk flag, lowest
+    sales first.
+    """
+    risk = backend.productline_sales(months)["SALES"].sort_values().reset_index()
+    risk["AT_RISK"] = risk["SALES"] < STOCK_RISK_SALES
+    return risk
+
+
+def cash_burn(backend, months: list, by: str) -> dict:
+    """Monthly cash burn per ``by`` group, with linear-trend forecasts for
+    every group and for the total.
+    """
+    trend = backend.category_burn(months, by=by)
+    # Every group gets a row per window month, zero where it spent nothing
+    grid = pd.MultiIndex.from_product([pd.PeriodIndex(months, freq="M"), trend[by].unique()], names=["MONTH", by])
+    trend = trend.set_index(["MONTH", by])["CASH_BURN"].reindex(grid, fill_value=0.0).reset_index()
+    total = trend.groupby("MONTH", as_index=False)["CASH_BURN"].sum().assign(ALL="All")
+    groups = (
+        trend.groupby(by, observed=True)["CASH_BURN"].sum().reset_index()
+        .merge(linear_trend_forecast(trend, by, "CASH_BURN")[[by, "FORECAST"]], on=by)
+        .sort_values("CASH_BURN", ascending=False)
+    )
+    return {
+        "forecast": float(linear_trend_forecast(total, "ALL", "CASH_BURN")["FORECAST"].iloc[0]),
+        "monthly": _records(total[["MONTH", "CASH_BURN"]]),
+        "trend": _records(trend),
+        "groups": _records(groups),
+    }
+
+
+def forecast_companions(cube: pd.DataFrame) -> list:
+    """Series a shared-model forecaster (the LSTM) trains on alongside
+    monthly revenue: gross and net profit, and sales per product line.
+    """
+    from dashboard.segments import segment_series
+
+    profit = rollup(cube, "MONTH", measures=["GROSS_PROFIT", "NET_PROFIT"])
+    return [profit["GROSS_PROFIT"], profit["NET_PROFIT"], *segment_series(cube, "PRODUCTLINE").values()]
+
+
+def revenue_forecasts(monthly_rev: pd.Series, companions=()) -> dict:
+    """Next-month revenue per enabled model; None where a model failed."""
+    forecasts = {}
+    for model, kind in REVENUE_MODELS.items():
+        if kind not in enabled_backends():
+            continue
+        try:
+            forecasts[model] = forecast_with(kind, monthly_rev, companions)
+        except Exception:
+            forecasts[model] = None
+    return forecasts
+
+
+def compute_snapshot(backend, forecasts: bool = True) -> dict:
+    """Every KPI for the backend's current data.
+
+    With ``forecasts=False`` the revenue models are skipped and
+    ``"forecasts"`` is left empty, for callers that run them separately.
+    """
+    version = backend.version()
+    cube = backend.cube()
+    months = last_months(cube, WINDOW_MONTHS)
+    monthly_rev = backend.monthly_revenue()
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "data_version": version,
+        "backend": backend.name,
+        "generated_at": time.time(),
+        "months": [str(month) for month in months],
+        "productlines": sorted(str(line) for line in cube["PRODUCTLINE"].dropna().unique()),
+        # Values that have a scoped report (see ``scope_snapshots``)
+        "scopes": {
+            column: sorted(str(value) for value in cube[column].dropna().unique())
+            for column in SCOPE_COLUMNS
+        },
+        "kpis": revenue_kpis(monthly_rev, months),
+        "orders": order_status(cube),
+        "forecasts": revenue_forecasts(monthly_rev, forecast_companions(cube)) if forecasts else {},
+        "profit_walk": _records(profit_walk(cube, months)),
+        "inventory": _records(inventory_risk(backend, months)),
+        "cash_burn": {by: cash_burn(backend, months, by) for by in BURN_GROUPS},
+    }
+
+
+def scope_snapshots(cube: pd.DataFrame, column: str, version: str) -> dict:
+    """Report-sized snapshots for every value of a cube dimension, keyed by
+    the value as a string.
+
+    Each holds the revenue KPIs, order status and profit walk of its slice,
+    plus a linear-trend revenue forecast (fitted for all slices at once)
+    when the slice spans more than one month.
+    """
+    trend = {}
+    if column != "MONTH":
+        monthly = rollup(cube, [column, "MONTH"], measures=["SALES"]).reset_index()
+        trend = linear_trend_forecast(monthly, column, "SALES").set_index(column)["FORECAST"]
+    snapshots = {}
+    for value, part in cube.groupby(column, observed=True):
+        # A month's report covers that month alone
+        months = last_months(part, 1 if column == "MONTH" else WINDOW_MONTHS)
+        monthly_rev = rollup(part, "MONTH", measures=["SALES"])["SALES"]
+        snapshots[str(value)] = {
+            "format": SNAPSHOT_FORMAT,
+            "data_version": version,
+            "scope": {"column": column, "value": str(value)},
+            "months": [str(month) for month in months],
+            "kpis": revenue_kpis(monthly_rev, months),
+            "orders": order_status(part),
+            "forecasts": {"Linear trend": float(trend[value])} if value in trend else {},
+            "profit_walk": _records(profit_walk(part, months)),
+        }
+    return snapshots
+
+
+def snapshot_path(version: str, directory=None) -> Path:
+    return Path(directory or SNAPSHOT_DIR) / f"kpi-v{SNAPSHOT_FORMAT}-{version}.json"
+
+
+def write_snapshot(snapshot: dict, directory=None) -> Path:
+    """Atomically write ``snapshot`` under its data version and return the path."""
+    path = snapshot_path(snapshot["data_version"], directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f, indent=1)
+        os.replace(tmp, path)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
+    return path
+
+
+@lru_cache(maxsize=8)
+def _read_snapshot(path: str, mtime_ns: int) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_snapshot(version: str, directory=None):
+    """The stored snapshot for ``version``, or None if there is none."""
+    path = snapshot_path(version, directory)
+    try:
+        return _read_snapshot(str(path), path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=8)
+def _live_snapshot(backend_name: str, path: str, version: str) -> dict:
+    from dashboard.backends import get_backend
+
+    snapshot = compute_snapshot(get_backend(backend_name, path), forecasts=False)
+    try:
+        write_snapshot(snapshot)
+    except OSError:
+        pass
+    return snapshot
+
+
+def current_snapshot(backend) -> dict:
+    """The snapshot for the backend's current data version.
+
+    A stored snapshot (e.g. from the nightly job) is used when it matches;
+    otherwise one is computed without forecasts, stored, and kept in memory.
+    """
+    with span("kpis.snapshot") as s:
+        version = backend.version()
+        snapshot = read_snapshot(version)
+        s.set(cache="miss" if snapshot is None else "hit")
+        if snapshot is None:
+            snapshot = _live_snapshot(backend.name, str(backend.path), version)
+        return snapshot
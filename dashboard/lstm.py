@@ -0,0 +1,141 @@
+"""LSTM training engine shared by the LSTM forecaster.
+
+One small model is trained across several monthly series at once (e.g.
+revenue, gross and net profit, and each product line). Each series is
+standardized on its own, cut into ``lookback``-month windows with
+``tf.data``, and the windows of all series are shuffled together.
+Training stops early once the loss plateaus, or when the wall-clock
+budget runs out. TensorFlow's thread pools are pinned (one thread each by
+default, ``DASHBOARD_TF_THREADS``), so concurrent forecast workers don't
+oversubscribe the CPU. TensorFlow is imported on first use only.
+"""
+import os
+import time
+
+import numpy as np
+
+TF_THREADS = int(os.environ.get("DASHBOARD_TF_THREADS", "1"))
+# Wall-clock budget for one training run, in seconds
+TIME_BUDGET = float(os.environ.get("DASHBOARD_LSTM_BUDGET_S", "20"))
+
+_threads_pinned = False
+
+
+def _tensorflow():
+    """Import TensorFlow, pinning its thread pools before the runtime starts."""
+    global _threads_pinned
+    import tensorflow as tf
+
+    if not _threads_pinned:
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(TF_THREADS)
+            tf.config.threading.set_inter_op_parallelism_threads(TF_THREADS)
+        except RuntimeError:
+            # The runtime was already initialized in this process
+            pass
+        _threads_pinned = True
+    return tf
+
+
+def _scale(values: np.ndarray):
+    mean = float(values.mean())
+    std = float(values.std()) or 1.0
+    return (values - mean) / std, mean, std
+
+
+def window_dataset(series_list, lookback: int, batch_size: int, seed: int = 0):
+    """``tf.data`` pipeline of ``(window, next value)`` pairs over all series.
+
+    Returns ``(dataset, scales)`` where ``scales`` holds each series'
+    ``(mean, std)``. Series too short for a single window add no pairs.
+    """
+    tf = _tensorflow()
+    datasets, scales, n_windows = [], [], 0
+    for series in series_list:
+        scaled, mean, std = _scale(np.asarray(series, dtype="float32"))
+        scales.append((mean, std))
+        if len(scaled) <= lookback:
+            continue
+        n_windows += len(scaled) - lookback
+        windows = (
+            tf.data.Dataset.from_tensor_slices(scaled)
+            .window(lookback + 1, shift=1, drop_remainder=True)
+            .flat_map(lambda w: w.batch(lookback + 1))
+            .map(lambda w: (tf.expand_dims(w[:-1], -1), w[-1:]))
+        )
+        datasets.append(windows)
+    if not datasets:
+        return None, scales
+    dataset = datasets[0]
+    for windows in datasets[1:]:
+        dataset = dataset.concatenate(windows)
+    dataset = (
+        dataset.apply(tf.data.experimental.assert_cardinality(n_windows))
+        .cache()
+        .shuffle(n_windows, seed=seed)
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+    return dataset, scales
+
+
+def _budget_callback(tf, seconds: float):
+    class TimeBudget(tf.keras.callbacks.Callback):
+        def on_train_begin(self, logs=None):
+            self.deadline = time.monotonic() + seconds
+
+        def on_train_batch_end(self, batch, logs=None):
+            if time.monotonic() > self.deadline:
+                self.model.stop_training = True
+
+    return TimeBudget()
+
+
+def train_and_forecast(series_list, lookback: int = 3, units: int = 50, epochs: int = 200, batch_size: int = 32,
+                       patience: int = 20, min_delta: float = 1e-3, budget: float = TIME_BUDGET, seed: int = 0):
+    """Train one LSTM on every series and forecast each one's next value.
+
+    Training stops once the loss (on standardized values) has improved by
+    less than ``min_delta`` for ``patience`` epochs. Returns
+    ``(forecasts, model)``. A series shorter than ``lookback`` months is
+    forecast as its last value.
+    """
+    tf = _tensorflow()
+    tf.keras.utils.set_random_seed(seed)
+    dataset, scales = window_dataset(series_list, lookback, batch_size, seed)
+    if dataset is None:
+        return [float(np.asarray(series)[-1]) for series in series_list], None
+
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(lookback, 1)),
+        tf.keras.layers.LSTM(units),
+        tf.keras.layers.Dense(1),
+    ])
+    model.compile(optimizer="adam", loss="mean_squared_error")
+    model.fit(
+        dataset,
+        epochs=epochs,
+        shuffle=False,  # the dataset reshuffles itself every epoch
+        verbose=0,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(monitor="loss", patience=patience, min_delta=min_delta,
+                                             restore_best_weights=True),
+            _budget_callback(tf, budget),
+        ],
+    )
+
+    # One batched predict for the last window of every long-enough series
+    last_windows, positions = [], []
+    forecasts = []
+    for i, (series, (mean, std)) in enumerate(zip(series_list, scales)):
+        values = np.asarray(series, dtype="float32")
+        forecasts.append(float(values[-1]))
+        if len(values) >= lookback:
+            last_windows.append((values[-lookback:] - mean) / std)
+            positions.append(i)
+    if last_windows:
+        predicted = model.predict(np.stack(last_windows)[..., None], verbose=0)[:, 0]
+        for i, value in zip(positions, predicted):
+            mean, std = scales[i]
+            forecasts[i] = float(value * std + mean)
+    return forecasts, model
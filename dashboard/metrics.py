@@ -0,0 +1,187 @@
+"""Lightweight span instrumentation.
+
+``span(name)`` times a block of code: wall time, CPU time of the calling
+thread, peak traced memory above the block's starting point (see below)
+and an optional cache hit/miss flag. Spans are only recorded when someone is
+listening:
+
+- a session recorder, started per script run by the dashboard's debug
+  panel (``record_session``), collects the spans of that run;
+- ``DASHBOARD_METRICS_FILE`` appends every span of the process (workers
+  included) to a file: Prometheus text samples for a ``.prom`` file,
+  JSON lines otherwise.
+
+With neither active, ``span`` returns a shared no-op object, so the cost
+is one context-variable lookup.
+
+Peak memory is only measured with ``DASHBOARD_METRICS_FILE``, where the
+whole process has opted in to profiling: it comes from ``tracemalloc``,
+which slows every allocation in the process while a span is open. A
+session recorder alone records wall and CPU time only, so one viewer's
+debug panel never slows the others. ``tracemalloc`` has a single
+process-wide peak, so a span that overlaps a span in another thread gets
+no peak rather than a wrong one.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+METRICS_FILE = os.environ.get("DASHBOARD_METRICS_FILE")
+# Peak memory is traced only when the process writes a metrics file
+TRACE_MEMORY = bool(METRICS_FILE)
+
+_recorder = ContextVar("dashboard_metrics_recorder", default=None)
+_current_span = ContextVar("dashboard_metrics_span", default=None)
+_file_lock = threading.Lock()
+_trace_lock = threading.Lock()
+# Open spans tracing memory, in every thread, and whether tracemalloc was started for them
+_open_spans = []
+_started_tracing = False
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    def __init__(self, name: str, recorder, attrs: dict):
+        self.name = name
+        self.recorder = recorder
+        self.attrs = attrs
+        self.parent = None
+        self.child_peak = 0
+        self.thread = threading.get_ident()
+        # Set once a span in another thread overlaps this one
+        self.shared = False
+
+    def set(self, **attrs):
+        """Attach attributes to the span, e.g. ``cache="hit"``."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        if TRACE_MEMORY:
+            self._start_tracing()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def _start_tracing(self):
+        global _started_tracing
+        with _trace_lock:
+            if not _open_spans and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            others = [open_span for open_span in _open_spans if open_span.thread != self.thread]
+            if others:
+                # The peak is process-wide, so neither span's peak is its own
+                self.shared = True
+                for other in others:
+                    other.shared = True
+            else:
+                # Only spans of this thread are open: hand the peak so far to
+                # the parent before resetting it for this span
+                if self.parent is not None:
+                    self.parent.child_peak = max(self.parent.child_peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+            _open_spans.append(self)
+            self.base, _ = tracemalloc.get_traced_memory()
+
+    def _stop_tracing(self):
+        global _started_tracing
+        with _trace_lock:
+            _, peak = tracemalloc.get_traced_memory()
+            _open_spans.remove(self)
+            if not _open_spans and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+        # reset_peak() in child spans hides their peaks from this one
+        peak = max(peak, self.child_peak)
+        if self.parent is not None:
+            self.parent.child_peak = max(self.parent.child_peak, peak)
+        return None if self.shared else max(peak - self.base, 0) / 2**20
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        peak_mb = self._stop_tracing() if TRACE_MEMORY else None
+        _current_span.reset(self._token)
+
+        record = {"span": self.name, "wall_s": wall, "cpu_s": cpu, "at": time.time(), **self.attrs}
+        if peak_mb is not None:
+            record["peak_mb"] = peak_mb
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.recorder is not None:
+            self.recorder.append(record)
+        if METRICS_FILE:
+            _append(record)
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager recording ``name`` if a recorder or metrics file is active.
+
+    With ``DASHBOARD_METRICS_FILE`` set, every open span keeps ``tracemalloc``
+    running, which makes all allocations in the process noticeably slower;
+    session recorders only time the block.
+    """
+    recorder = _recorder.get()
+    if recorder is None and not METRICS_FILE:
+        return _NOOP
+    return Span(name, recorder, attrs)
+
+
+def cached_call(name: str, fn, *args):
+    """Call an ``lru_cache``-wrapped ``fn`` inside a span flagged as a cache hit or miss."""
+    with span(name) as s:
+        hits = fn.cache_info().hits
+        result = fn(*args)
+        s.set(cache="hit" if fn.cache_info().hits > hits else "miss")
+    return result
+
+
+def record_session(enabled: bool):
+    """Start (or, with ``enabled=False``, clear) the span list of this script run.
+
+    Returns the list the run's spans are appended to, or None.
+    """
+    recorder = [] if enabled else None
+    _recorder.set(recorder)
+    return recorder
+
+
+def _prometheus(record: dict) -> str:
+    labels = {"span": record["span"]}
+    if "cache" in record:
+        labels["cache"] = record["cache"]
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    stamp = int(record["at"] * 1000)
+    return "".join(
+        f"dashboard_span_{metric}{{{label_text}}} {record[field]:.6f} {stamp}\n"
+        for metric, field in (("wall_seconds", "wall_s"), ("cpu_seconds", "cpu_s"), ("peak_megabytes", "peak_mb"))
+        if field in record
+    )
+
+
+def _append(record: dict):
+    line = _prometheus(record) if METRICS_FILE.endswith(".prom") else json.dumps(record) + "\n"
+    try:
+        with _file_lock, open(METRICS_FILE, "a") as f:
+            f.write(line)
+    except OSError:
+        pass
@@ -0,0 +1,155 @@
+"""On-disk registry of fitted forecast models.
+
+Entries are keyed by a content hash of the input series plus the model
+config, so a forecast is only refit when the monthly series or the model
+settings change. Each entry is a directory holding the model artifacts
+and a ``meta.json`` with the cached forecast. The least recently used
+entries are evicted once the registry grows past its size cap.
+
+A registry can also track the latest entry for a named stream (e.g. the
+monthly revenue ARIMA), so a model can be updated with new observations
+instead of being refit from scratch.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.data import CACHE_DIR
+
+DEFAULT_MAX_BYTES = int(os.environ.get("DASHBOARD_MODEL_CACHE_MB", "256")) * 1024 * 1024
+META_FILE = "meta.json"
+HEADS_DIR = ".heads"
+
+
+def stream_key(name: str, config: dict) -> str:
+    """Hash a stream name (e.g. the series name) together with a model config."""
+    payload = json.dumps({"stream": name, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def series_key(series: pd.Series, config: dict) -> str:
+    """Hash a series (index and values) together with a model config."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    digest.update("|".join(map(str, series.index)).encode())
+    digest.update(pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64").tobytes())
+    return digest.hexdigest()[:32]
+
+
+def group_key(series_list, config: dict) -> str:
+    """Hash several series, in order, for a model trained on all of them."""
+    digest = hashlib.sha256()
+    for series in series_list:
+        digest.update(series_key(series, config).encode())
+    return digest.hexdigest()[:32]
+
+
+class ModelRegistry:
+    def __init__(self, root=CACHE_DIR / "models", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str):
+        """Return the entry's metadata, or None on a miss."""
+        meta_path = self.entry_dir(key) / META_FILE
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(meta_path)
+        except OSError:
+            # Evicted by another process since the read; the metadata is still valid
+            pass
+        return meta
+
+    def put(self, key: str, meta: dict, write_artifacts=None) -> dict:
+        """Store an entry; ``write_artifacts(dir)`` saves model files into it."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=".staging-"))
+        try:
+            if write_artifacts is not None:
+                write_artifacts(staging)
+            with open(staging / META_FILE, "w") as f:
+                json.dump(meta, f)
+            target = self.entry_dir(key)
+            with self._lock:
+                shutil.rmtree(target, ignore_errors=True)
+                try:
+                    os.replace(staging, target)
+                except OSError:
+                    # Another process stored the same key in between; the key is a
+                    # content hash, so its entry is as good as ours
+                    if not (target / META_FILE).exists():
+                        raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+        return meta
+
+    def set_head(self, stream: str, key: str):
+        """Record ``key`` as the latest entry of ``stream``."""
+        heads = self.root / HEADS_DIR
+        heads.mkdir(parents=True, exist_ok=True)
+        tmp = heads / f"{stream}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_text(key)
+        os.replace(tmp, heads / stream)
+
+    def head(self, stream: str):
+        """Return ``(key, meta)`` of the stream's latest entry, or None."""
+        try:
+            key = (self.root / HEADS_DIR / stream).read_text().strip()
+        except OSError:
+            return None
+        meta = self.get(key)
+        return None if meta is None else (key, meta)
+
+    def evict(self):
+        """Delete least recently used entries until the registry fits its cap.
+
+        Other processes may add or evict entries during the walk; an entry
+        that vanishes under it is skipped.
+        """
+        with self._lock:
+            entries = []
+            try:
+                listing = list(self.root.iterdir())
+            except OSError:
+                return
+            for entry in listing:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    mtime = (entry / META_FILE).stat().st_mtime
+                    size = sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+                except OSError:
+                    continue
+                entries.append((mtime, size, entry))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+
+
+_default_registry = None
+
+
+def default_registry() -> ModelRegistry:
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
@@ -0,0 +1,134 @@
+"""PDF reports rendered from KPI snapshots (see ``dashboard.kpis``).
+
+A report is a pure function of its snapshot, so rendered PDFs are stored
+in ``REPORT_DIR`` under a hash of the snapshot and reused by every
+session and batch run until the numbers change. Batches of scoped
+reports (per product line, month or purchase category) are rendered in
+the shared process pool:
+
+    python -m dashboard reports --scope productline month category
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import as_completed
+from pathlib import Path
+
+import pandas as pd
+from fpdf import FPDF
+
+from dashboard.data import CACHE_DIR
+from dashboard.kpis import scope_snapshots
+from dashboard.metrics import span
+
+REPORT_DIR = CACHE_DIR / "reports"
+# scope name -> cube dimension
+REPORT_SCOPES = {"productline": "PRODUCTLINE", "month": "MONTH", "category": "PURCHASE_CATEGORY"}
+SCOPE_LABELS = {"PRODUCTLINE": "Product Line", "MONTH": "Month", "PURCHASE_CATEGORY": "Category"}
+
+
+def _month_name(month: str) -> str:
+    return pd.Period(month, "M").strftime("%B")
+
+
+def generate_pdf(snapshot: dict) -> bytes:
+    """Render the KPI summary report for a snapshot (global or scoped)."""
+    kpis = snapshot["kpis"]
+    orders = snapshot["orders"]
+    scope = snapshot.get("scope")
+
+    # Initialize the PDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Add the title
+    pdf.cell(200, 10, txt="KPI Summary Report", ln=True, align='C')
+    if scope is not None:
+        pdf.cell(200, 10, txt=f"{SCOPE_LABELS[scope['column']]}: {scope['value']}", ln=True, align='C')
+    pdf.ln(10)
+
+    # Add the revenue and prediction details
+    pdf.cell(200, 10, txt=f"Overall Revenue: £{kpis['total_revenue']:,.0f}", ln=True)
+    pdf.cell(200, 10, txt=f"Latest Month Revenue ({_month_name(kpis['latest_month'])}): "
+                          f"£{kpis['latest_month_revenue']:,.0f}", ln=True)
+    pdf.cell(200, 10, txt=f"3-Month Growth Rate: {kpis['growth_rate']:.2f}%", ln=True)
+    for model, prediction in snapshot["forecasts"].items():
+        figure = "n/a" if prediction is None else f"£{prediction:,.0f}"
+        pdf.cell(200, 10, txt=f"Predicted Revenue ({_month_name(kpis['predicted_month'])} - {model}): {figure}",
+                 ln=True)
+
+    # Add the orders shipped and not shipped information to the PDF
+    pdf.cell(200, 10, txt=f"Orders Shipped: {orders['shipped']:,}", ln=True)
+    pdf.cell(200, 10, txt=f"Orders Not Shipped: {orders['not_shipped']:,}", ln=True)
+
+    # Profit walk over the snapshot's window
+    pdf.ln(5)
+    for row in snapshot.get("profit_walk", []):
+        pdf.cell(200, 10, txt=f"{row['MONTH']}: Sales £{row['SALES']:,.0f}, Gross Profit £{row['GROSS_PROFIT']:,.0f}, "
+                              f"Net Profit £{row['NET_PROFIT']:,.0f}", ln=True)
+
+    # Output the PDF as a byte object
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def snapshot_hash(snapshot: dict) -> str:
+    # The generation time doesn't change the report, so it stays out of the key
+    payload = {key: value for key, value in snapshot.items() if key != "generated_at"}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def report_path(snapshot: dict) -> Path:
+    scope = snapshot.get("scope")
+    prefix = "kpi" if scope is None else f"kpi-{scope['column'].lower()}"
+    return REPORT_DIR / f"{prefix}-{snapshot_hash(snapshot)}.pdf"
+
+
+def render_report(snapshot: dict) -> Path:
+    """Write (or reuse) the PDF for ``snapshot`` and return its path."""
+    with span("report.pdf") as s:
+        path = report_path(snapshot)
+        s.set(cache="hit" if path.exists() else "miss")
+        if path.exists():
+            return path
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=REPORT_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(generate_pdf(snapshot))
+            os.replace(tmp, path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        return path
+
+
+def render_reports(snapshots: dict) -> dict:
+    """Render many snapshots, farming the uncached ones out to the process pool.
+
+    ``snapshots`` maps any key to a snapshot; returns the same keys mapped
+    to PDF paths.
+    """
+    from dashboard.executor import submit_job
+
+    paths, pending = {}, {}
+    for key, snapshot in snapshots.items():
+        path = report_path(snapshot)
+        if path.exists():
+            paths[key] = path
+        else:
+            pending[submit_job(render_report, snapshot)] = key
+    for future in as_completed(pending):
+        paths[pending[future]] = future.result()
+    return paths
+
+
+def generate_reports(backend, scopes=tuple(REPORT_SCOPES)) -> dict:
+    """Scoped KPI reports for every value of each scope, as ``(scope, value) -> path``."""
+    cube, version = backend.cube(), backend.version()
+    snapshots = {
+        (scope, value): snapshot
+        for scope in scopes
+        for value, snapshot in scope_snapshots(cube, REPORT_SCOPES[scope], version).items()
+    }
+    return render_reports(snapshots)
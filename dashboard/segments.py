@@ -0,0 +1,92 @@
+"""Next-month forecasts for every product line, customer or other segment.
+
+Each segment's monthly series comes from the cube. ARIMA fits fan out
+over the shared process pool, one job per series. The pool size bounds
+the concurrency, every fit has a time limit, and the model registry
+caches each series separately, so only segments whose history changed
+are refit. Linear trends for all segments are fitted in one batched pass
+(``dashboard.trends``). They answer the ``linear`` model directly and
+stand in for ARIMA fits that are too short, fail or time out.
+"""
+import os
+from concurrent.futures import as_completed
+
+import pandas as pd
+
+from dashboard.aggregates import rollup
+from dashboard.metrics import span
+from dashboard.trends import linear_trend_forecast
+
+SEGMENT_MODELS = ["arima", "linear"]
+# Per-series time limit for a fit, in seconds
+SERIES_TIMEOUT = float(os.environ.get("DASHBOARD_SERIES_TIMEOUT", "30"))
+# Shorter histories are forecast with the linear trend only
+ARIMA_MIN_MONTHS = 6
+
+
+def segment_series(cube: pd.DataFrame, by: str, measure: str = "SALES") -> dict:
+    """Monthly ``measure`` per ``by`` value, keyed by the value as a string.
+
+    Months without orders count as zero from a segment's first order on.
+    Each series is named after its measure and segment, so ARIMA updates
+    carry forward per segment.
+    """
+    monthly = rollup(cube, [by, "MONTH"], measures=[measure])[measure].unstack(by)
+    months = pd.period_range(monthly.index.min(), monthly.index.max(), freq="M")
+    monthly = monthly.reindex(months)
+    series = {}
+    for value in monthly.columns:
+        values = monthly[value]
+        started = values.notna().cumsum() > 0
+        series[str(value)] = values[started].fillna(0.0).rename(f"{measure}[{by}={value}]")
+    return series
+
+
+class SegmentForecasts:
+    """Forecasts for every segment of one ``by`` column and measure, in flight.
+
+    ``result()`` waits for the pool jobs and returns one row per segment.
+    """
+
+    def __init__(self, cube: pd.DataFrame, by: str, measure: str = "SALES", model: str = "arima",
+                 timeout: float = SERIES_TIMEOUT):
+        self.by, self.measure, self.model = by, measure, model
+        self.series = segment_series(cube, by, measure)
+
+        long = pd.concat(
+            [s.rename_axis("MONTH").rename(measure).reset_index().assign(**{by: key}) for key, s in self.series.items()],
+            ignore_index=True,
+        )
+        self.trend = linear_trend_forecast(long, by, measure).set_index(by)["FORECAST"]
+
+        self.futures = {}
+        if model != "linear":
+            from dashboard.executor import submit_forecast
+
+            for key, series in self.series.items():
+                if len(series) >= ARIMA_MIN_MONTHS:
+                    self.futures[submit_forecast(model, series, timeout=timeout)] = key
+
+    def result(self) -> pd.DataFrame:
+        """Columns: ``by``, N_MONTHS, LAST (latest month's value), FORECAST,
+        MODEL and STATUS ("ok", "short", "timeout" or "error"). Forecasts are
+        clipped at zero: a falling linear trend can extrapolate below it."""
+        rows = {
+            key: {"FORECAST": float(self.trend[key]), "MODEL": "linear",
+                  "STATUS": "ok" if self.model == "linear" else "short"}
+            for key in self.series
+        }
+        with span(f"segments.{self.model}", segments=len(self.series)):
+            for future in as_completed(self.futures):
+                key = self.futures[future]
+                try:
+                    rows[key] = {"FORECAST": float(future.result()), "MODEL": self.model, "STATUS": "ok"}
+                except TimeoutError:
+                    rows[key]["STATUS"] = "timeout"
+                except Exception:
+                    rows[key]["STATUS"] = "error"
+        frame = pd.DataFrame.from_dict(rows, orient="index")
+        frame["FORECAST"] = frame["FORECAST"].clip(lower=0.0)
+        frame.insert(0, "N_MONTHS", [len(self.series[key]) for key in frame.index])
+        frame.insert(1, "LAST", [float(self.series[key].iloc[-1]) for key in frame.index])
+        return frame.rename_axis(self.by).reset_index()
@@ -0,0 +1,198 @@
+"""Benchmark the dashboard's load, aggregation, forecast and output stages.
+
+Each stage runs on synthetic data (see ``synthetic_data.py``) with every
+dashboard cache pointed at a throwaway directory and bypassed, so the
+numbers are cold-path costs. Each stage runs once untimed first, so
+one-off imports (TensorFlow for ``lstm_fit``) are not counted; wall time
+is the median of ``--repeat`` runs after that, and peak memory comes from
+one extra run under ``tracemalloc``. Prints one JSON object. With
+``--baseline`` it exits non-zero when a stage is slower (or peaks higher)
+than the stored result by more than ``--tolerance`` and by more than an
+absolute floor (``--min-seconds``, ``--min-mb``), so millisecond stages
+don't fail on timer noise. For use in CI.
+
+    python scripts/benchmark.py --rows 100000 --months 36 --output bench.json
+    python scripts/benchmark.py --rows 100000 --months 36 --baseline bench.json
+"""
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Keep the benchmark's caches away from the real ones before dashboard is imported
+if "DASHBOARD_CACHE_DIR" not in os.environ:
+    os.environ["DASHBOARD_CACHE_DIR"] = tempfile.mkdtemp(prefix="dashboard-bench-")
+    atexit.register(shutil.rmtree, os.environ["DASHBOARD_CACHE_DIR"], ignore_errors=True)
+
+import pandas as pd  # noqa: E402
+
+from dashboard.aggregates import build_monthly_cube, last_months, rollup  # noqa: E402
+from dashboard.backends import DataBackend  # noqa: E402
+from dashboard.data import read_orders_csv  # noqa: E402
+from dashboard.export import export_orders, export_path  # noqa: E402
+from dashboard.forecasting import LSTM_EPOCHS, ArimaForecaster, LstmForecaster  # noqa: E402
+from dashboard.kpis import (  # noqa: E402
+    BURN_GROUPS, WINDOW_MONTHS, cash_burn, compute_snapshot, inventory_risk, order_status, profit_walk,
+    revenue_kpis,
+)
+from dashboard.reports import generate_pdf  # noqa: E402
+from synthetic_data import write_orders  # noqa: E402
+
+
+class FrozenBackend(DataBackend):
+    """Serves an already built frame and cube, so stages time only themselves."""
+
+    name = "benchmark"
+
+    def __init__(self, orders: pd.DataFrame, cube: pd.DataFrame):
+        super().__init__()
+        self.orders = orders
+        self._cube = cube
+
+    def version(self) -> str:
+        return "benchmark"
+
+    def cube(self) -> pd.DataFrame:
+        return self._cube
+
+    def iter_orders(self, chunk_rows: int = 250_000):
+        for start in range(0, len(self.orders), chunk_rows):
+            yield self.orders.iloc[start:start + chunk_rows]
+
+
+def _export_csv(ctx):
+    export_path(ctx["backend"].version(), "csv.gz").unlink(missing_ok=True)
+    return export_orders(ctx["backend"], "csv.gz")
+
+
+STAGES = {
+    "csv_load": lambda ctx: read_orders_csv(ctx["path"]),
+    "cube": lambda ctx: build_monthly_cube(ctx["orders"]),
+    "kpis": lambda ctx: (
+        revenue_kpis(rollup(ctx["cube"], "MONTH", measures=["SALES"])["SALES"], ctx["months"]),
+        order_status(ctx["cube"]),
+    ),
+    "profit_waterfall": lambda ctx: profit_walk(ctx["cube"], ctx["months"]),
+    "inventory_summary": lambda ctx: inventory_risk(ctx["backend"], ctx["months"]),
+    "cash_burn": lambda ctx: [cash_burn(ctx["backend"], ctx["months"], by) for by in BURN_GROUPS],
+    "arima_fit": lambda ctx: ArimaForecaster().fit_predict(ctx["monthly_rev"]),
+    "lstm_fit": lambda ctx: LstmForecaster(epochs=ctx["lstm_epochs"]).fit_predict(ctx["monthly_rev"]),
+    "pdf": lambda ctx: generate_pdf(ctx["snapshot"]),
+    "csv_export": _export_csv,
+}
+
+
+# Absolute growth below which a metric never counts as a regression
+MIN_DELTAS = {"seconds": 0.05, "peak_mb": 1.0}
+
+
+def run_stage(fn, ctx, repeat: int) -> dict:
+    # Warm-up: lazy imports and first-call setup are not the stage's cost
+    fn(ctx)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(ctx)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_mb": peak / 2**20, "runs": repeat}
+
+
+def compare(result: dict, baseline: dict, tolerance: float, floors: dict = None) -> list:
+    """Regressions of ``result`` against ``baseline`` as readable lines.
+
+    A metric regresses when it grows by more than ``tolerance`` and by more
+    than its absolute floor in ``floors``.
+    """
+    floors = {**MIN_DELTAS, **(floors or {})}
+    failures = []
+    for stage, current in result["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            delta = current[metric] - previous[metric]
+            if current[metric] > previous[metric] * (1 + tolerance) and delta > floors[metric]:
+                failures.append(f"{stage}.{metric}: {current[metric]:.3f} > {previous[metric]:.3f} "
+                                f"(+{tolerance:.0%} allowed)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", type=Path, help="existing order CSV to use instead of generating one")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lstm-epochs", type=int, default=LSTM_EPOCHS)
+    parser.add_argument("--output", type=Path, help="also write the result JSON here (e.g. a new baseline)")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this result JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown / memory growth per stage (default 0.25 = 25%%)")
+    parser.add_argument("--min-seconds", type=float, default=MIN_DELTAS["seconds"],
+                        help="ignore slowdowns smaller than this (default 0.05)")
+    parser.add_argument("--min-mb", type=float, default=MIN_DELTAS["peak_mb"],
+                        help="ignore peak memory growth smaller than this (default 1)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-data-") as tmp:
+        path = args.data or write_orders(Path(tmp) / "orders.csv", args.rows, args.months, seed=args.seed)
+
+        # Shared inputs, built once outside the timed stages
+        ctx = {"path": path, "lstm_epochs": args.lstm_epochs}
+        ctx["orders"] = read_orders_csv(path)
+        ctx["cube"] = build_monthly_cube(ctx["orders"])
+        ctx["months"] = last_months(ctx["cube"], WINDOW_MONTHS)
+        ctx["monthly_rev"] = rollup(ctx["cube"], "MONTH", measures=["SALES"])["SALES"]
+        ctx["backend"] = FrozenBackend(ctx["orders"], ctx["cube"])
+        ctx["snapshot"] = compute_snapshot(ctx["backend"], forecasts=False)
+
+        result = {
+            "meta": {
+                "rows": len(ctx["orders"]),
+                "months": int(ctx["cube"]["MONTH"].nunique()),
+                "data": str(args.data) if args.data else "synthetic",
+                "seed": args.seed,
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "stages": {stage: run_stage(STAGES[stage], ctx, args.repeat) for stage in args.stages},
+        }
+
+    print(json.dumps(result, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline is not None:
+        failures = compare(result, json.loads(args.baseline.read_text()), args.tolerance,
+                           {"seconds": args.min_seconds, "peak_mb": args.min_mb})
+        for failure in failures:
+            print(f"regression: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
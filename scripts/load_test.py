@@ -0,0 +1,269 @@
+"""Load-test the dashboard with concurrent headless sessions.
+
+Runs ``app.py`` on synthetic data (see ``synthetic_data.py``) in
+Streamlit's AppTest, one thread per simulated viewer. At every level of
+``--sessions`` all sessions start together: each does a first load, then
+``--reruns`` widget changes (cash burn grouping, forecast segment and
+model, report scope), like a viewer clicking through the panels. Per
+level it reports p50/p95/p99 render latency for first loads, reruns and
+both, throughput (renders per second), CPU seconds of the process tree
+(app process plus forecast workers) and RSS.
+
+A session that fails (an app exception, a missing widget or an error in
+the harness itself) records the failure and stops; each level reports
+its errors and how many of the expected renders never happened.
+
+One warm-up session, with the same reruns, runs first and is reported
+separately (its first load is the cold load), so levels measure the
+steady state every later viewer sees rather than the one-off snapshot,
+forecast and backtest work. Runs offline; caches go to a throwaway
+directory. Prints one JSON object. With ``--baseline`` it exits non-zero
+when a level's p95 latency or throughput is worse than the stored result
+by more than ``--tolerance``, or when renders are missing.
+
+    python scripts/load_test.py --sessions 1 2 4 8 --reruns 4 --output load.json
+    python scripts/load_test.py --sessions 1 2 4 8 --baseline load.json
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Keep the load test's caches away from the real ones before dashboard is imported
+if "DASHBOARD_CACHE_DIR" not in os.environ:
+    os.environ["DASHBOARD_CACHE_DIR"] = tempfile.mkdtemp(prefix="dashboard-load-")
+    atexit.register(shutil.rmtree, os.environ["DASHBOARD_CACHE_DIR"], ignore_errors=True)
+
+from dashboard.data import DATA_PATH  # noqa: E402
+from dashboard.forecasting import enabled_backends  # noqa: E402
+from dashboard.kpis import BURN_GROUPS, SCOPE_COLUMNS  # noqa: E402
+from dashboard.segments import SEGMENT_MODELS  # noqa: E402
+from synthetic_data import write_orders  # noqa: E402
+
+# Keyed radio widgets a simulated viewer cycles through, with their values as app.py offers them
+RERUN_WIDGETS = {
+    "burn_by": BURN_GROUPS,
+    "segment_by": ["PRODUCTLINE", "CUSTOMERNAME"],
+    "segment_model": [model for model in SEGMENT_MODELS if model == "linear" or model in enabled_backends()],
+    "report_scope": SCOPE_COLUMNS,
+}
+PERCENTILES = (50, 95, 99)
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _proc_stat(pid: str):
+    """``(ppid, cpu seconds, rss MB)`` of a process from /proc, or None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # Fields after the command name: state ppid ... utime(12) stime(13) ... rss(22)
+    cpu = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    return int(fields[1]), cpu, int(fields[21]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def process_tree() -> dict:
+    """CPU seconds and RSS of this process and its live descendants.
+
+    Forecast workers run in child processes, so their CPU counts too.
+    Without /proc only this process (and its reaped children) is measured.
+    """
+    if not os.path.isdir("/proc"):
+        times = os.times()
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"cpu_s": times.user + times.system + times.children_user + times.children_system,
+                "rss_mb": peak / 2**20 if sys.platform == "darwin" else peak / 1024, "processes": 1}
+    stats = {}
+    for pid in os.listdir("/proc"):
+        if pid.isdigit():
+            stat = _proc_stat(pid)
+            if stat is not None:
+                stats[int(pid)] = stat
+    tree, frontier = {os.getpid()}, [os.getpid()]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, (ppid, _, _) in stats.items() if ppid == parent and pid not in tree]
+        tree.update(children)
+        frontier.extend(children)
+    return {"cpu_s": sum(stats[pid][1] for pid in tree if pid in stats),
+            "rss_mb": sum(stats[pid][2] for pid in tree if pid in stats),
+            "app_rss_mb": stats[os.getpid()][2], "processes": len(tree)}
+
+
+def _timed_run(app, timeout: float, renders: list, kind: str):
+    start = time.perf_counter()
+    app.run(timeout=timeout)
+    renders.append({"kind": kind, "seconds": time.perf_counter() - start,
+                    "error": str(app.exception[0].value) if app.exception else None})
+
+
+def session(app_path: str, reruns: int, timeout: float, start: threading.Barrier, renders: list):
+    """One simulated viewer: a first load, then ``reruns`` widget changes.
+
+    Stops at the first failure, which is appended to ``renders`` with no
+    timing.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    start.wait()
+    try:
+        app = AppTest.from_file(app_path, default_timeout=timeout)
+        _timed_run(app, timeout, renders, "first_load")
+        widgets = list(RERUN_WIDGETS.items())
+        for step in range(reruns):
+            if app.exception:
+                return
+            key, values = widgets[step % len(widgets)]
+            radio = app.radio(key=key)
+            radio.set_value(values[(values.index(radio.value) + 1) % len(values)])
+            _timed_run(app, timeout, renders, "rerun")
+    except Exception as exc:
+        renders.append({"kind": "failure", "seconds": None, "error": f"{type(exc).__name__}: {exc}"})
+
+
+def percentiles(seconds: list) -> dict:
+    if not seconds:
+        return {f"p{q}": None for q in PERCENTILES}
+    return {f"p{q}": float(np.percentile(seconds, q)) for q in PERCENTILES}
+
+
+def run_level(app_path: str, sessions: int, reruns: int, timeout: float) -> dict:
+    """``sessions`` concurrent viewers, started together; latency, throughput and resources."""
+    renders = []
+    barrier = threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=session, args=(app_path, reruns, timeout, barrier, renders), daemon=True)
+               for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    before = process_tree()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    after = process_tree()
+    errors = [render["error"] for render in renders if render["error"]]
+    renders = [render for render in renders if render["seconds"] is not None]
+    latency = {kind: percentiles([render["seconds"] for render in renders if render["kind"] == kind])
+               for kind in ("first_load", "rerun")}
+    latency["all"] = percentiles([render["seconds"] for render in renders])
+    cpu = after["cpu_s"] - before["cpu_s"]
+    return {
+        "sessions": sessions,
+        "renders": len(renders),
+        # Renders a failed session never got to
+        "missing_renders": sessions * (1 + reruns) - len(renders),
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": len(renders) / wall if wall else None,
+        "latency_s": latency,
+        "cpu_s": cpu,
+        # Share of the machine's CPUs the process tree kept busy
+        "cpu_utilisation": cpu / wall / (os.cpu_count() or 1) if wall else None,
+        "rss_mb": after["rss_mb"],
+        "processes": after["processes"],
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of ``result`` against ``baseline`` as readable lines."""
+    failures = []
+    previous_levels = {level["sessions"]: level for level in baseline.get("levels", [])}
+    for level in result["levels"]:
+        previous = previous_levels.get(level["sessions"])
+        if level["missing_renders"] or level["errors"]:
+            failures.append(f"{level['sessions']} sessions: {level['missing_renders']} renders missing, "
+                            f"{len(level['errors'])} errors")
+        if previous is None:
+            continue
+        p95, previous_p95 = level["latency_s"]["all"]["p95"], previous["latency_s"]["all"]["p95"]
+        if p95 is not None and previous_p95 is not None and p95 > previous_p95 * (1 + tolerance):
+            failures.append(f"{level['sessions']} sessions p95: {p95:.3f}s > {previous_p95:.3f}s "
+                            f"(+{tolerance:.0%} allowed)")
+        rps, previous_rps = level["throughput_rps"], previous["throughput_rps"]
+        if rps is not None and previous_rps and rps < previous_rps * (1 - tolerance):
+            failures.append(f"{level['sessions']} sessions throughput: {rps:.2f}/s < {previous_rps:.2f}/s "
+                            f"(-{tolerance:.0%} allowed)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent sessions per level (default 1 2 4 8)")
+    parser.add_argument("--reruns", type=int, default=4, help="widget changes per session after its first load")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", type=Path, help="existing order CSV to use instead of generating one")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per render")
+    parser.add_argument("--output", type=Path, help="also write the result JSON here (e.g. a new baseline)")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this result JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 slowdown / throughput drop per level (default 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    app_path = str(ROOT / "app.py")
+    with tempfile.TemporaryDirectory(prefix="dashboard-load-data-") as tmp:
+        # The app reads its data file relative to the working directory
+        data = Path(tmp) / DATA_PATH
+        if args.data is not None:
+            shutil.copyfile(args.data, data)
+        else:
+            write_orders(data, args.rows, args.months, seed=args.seed)
+        os.chdir(tmp)
+
+        warmup = []
+        run_session = threading.Thread(target=session,
+                                       args=(app_path, args.reruns, args.timeout, threading.Barrier(1), warmup))
+        run_session.start()
+        run_session.join()
+        failed = [render["error"] for render in warmup if render["error"]]
+        if failed:
+            print(f"warm-up session failed: {failed[0]}", file=sys.stderr)
+            return 1
+        result = {
+            "meta": {
+                "rows": args.rows if args.data is None else None,
+                "months": args.months if args.data is None else None,
+                "data": str(args.data) if args.data else "synthetic",
+                "seed": args.seed,
+                "reruns": args.reruns,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "cold_load_s": warmup[0]["seconds"] if warmup else None,
+            "warmup_s": sum(render["seconds"] for render in warmup),
+            "levels": [run_level(app_path, sessions, args.reruns, args.timeout) for sessions in args.sessions],
+        }
+
+    print(json.dumps(result, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline is not None:
+        failures = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for failure in failures:
+            print(f"regression: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
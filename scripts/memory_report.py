@@ -0,0 +1,103 @@
+"""Report how the dashboard's memory grows with the number of sessions.
+
+Opens ``--sessions`` headless dashboard sessions (Streamlit's AppTest) one
+after another in a single process, keeping each one alive, and records
+the process RSS after every session. The dataset is shared at process
+level, so only the first session should pay for it; the marginal RSS of
+later sessions is the per-session overhead and should stay flat. Also
+breaks down the shared order frame's footprint per column against a
+plain ``read_csv`` of the same file. Prints one JSON object.
+
+    python scripts/memory_report.py --sessions 8
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from dashboard.data import DATA_PATH, load_orders  # noqa: E402
+
+
+def _rss_mb() -> float:
+    """Current resident set size; the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def dataset_footprint(path=DATA_PATH) -> dict:
+    """Per-column MB of the shared prepared frame vs. a plain ``read_csv``."""
+    compact = load_orders(path).memory_usage(deep=True, index=False) / 2**20
+    raw = pd.read_csv(path).rename(columns=str.strip).memory_usage(deep=True, index=False) / 2**20
+    columns = {
+        column: {"compact_mb": round(float(compact[column]), 3),
+                 "raw_mb": round(float(raw[column]), 3) if column in raw else None}
+        for column in compact.index
+    }
+    return {"rows": len(load_orders(path)), "compact_mb": float(compact.sum()), "raw_mb": float(raw.sum()),
+            "columns": columns}
+
+
+def session_growth(sessions: int, timeout: float) -> list:
+    from streamlit.testing.v1 import AppTest
+
+    alive, steps = [], []
+    previous = _rss_mb()
+    for n in range(1, sessions + 1):
+        start = time.perf_counter()
+        app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=timeout).run()
+        if app.exception:
+            raise RuntimeError(f"session {n} failed: {app.exception[0].value}")
+        alive.append(app)
+        gc.collect()
+        rss = _rss_mb()
+        steps.append({"sessions": n, "seconds": time.perf_counter() - start, "rss_mb": rss,
+                      "added_mb": rss - previous})
+        previous = rss
+    return steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per session run")
+    parser.add_argument("--output", type=Path, help="also write the report JSON here")
+    args = parser.parse_args(argv)
+
+    # The app resolves its data file relative to the working directory
+    os.chdir(ROOT)
+    baseline = _rss_mb()
+    steps = session_growth(args.sessions, args.timeout)
+    later = [step["added_mb"] for step in steps[1:]]
+    report = {
+        "baseline_rss_mb": baseline,
+        "dataset": dataset_footprint(),
+        "steps": steps,
+        "first_session_mb": steps[0]["added_mb"],
+        # Median marginal RSS of every session after the first
+        "per_session_mb": statistics.median(later) if later else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
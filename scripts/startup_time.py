@@ -0,0 +1,100 @@
+"""Measure dashboard import time and memory with lazy vs eager forecaster imports.
+
+Each measurement runs in a fresh interpreter so module caches don't leak
+between runs. Prints one JSON object; with ``--max-seconds`` it exits
+non-zero when the lazy import exceeds the budget, for use in CI.
+
+    python scripts/startup_time.py --repeat 5 --max-seconds 3
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+APP_PATH = ROOT / "app.py"
+
+
+def app_imports(path=APP_PATH) -> list:
+    """Modules ``app.py`` imports at module level, in order.
+
+    Read from the script itself, so the measurement follows the app as its
+    imports change; running the script would also compute the dashboard.
+    """
+    modules = []
+    for node in ast.parse(Path(path).read_text()).body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+            # "from dashboard import graph" imports the submodule too
+            package = ROOT.joinpath(*node.module.split("."))
+            names += [f"{node.module}.{alias.name}" for alias in node.names
+                      if (package / f"{alias.name}.py").exists()]
+        else:
+            continue
+        modules += [name for name in names if name not in modules]
+    return modules
+
+
+# What the dashboard process imports before any forecast is requested
+LAZY_IMPORTS = app_imports()
+# The forecasting libraries app.py used to import unconditionally
+EAGER_IMPORTS = LAZY_IMPORTS + [
+    "statsmodels.tsa.arima.model", "sklearn.linear_model", "tensorflow.keras.models",
+]
+
+PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": rss_kb / 1024}}))
+"""
+
+
+def measure(modules, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(modules=modules)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "max_rss_mb": statistics.median(run["max_rss_mb"] for run in runs),
+        "runs": len(runs),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="fail if the lazy import takes longer than this")
+    parser.add_argument("--skip-eager", action="store_true",
+                        help="only measure the lazy path (no TensorFlow needed)")
+    args = parser.parse_args(argv)
+
+    result = {"lazy": measure(LAZY_IMPORTS, args.repeat)}
+    if not args.skip_eager:
+        result["eager"] = measure(EAGER_IMPORTS, args.repeat)
+        result["saved_seconds"] = result["eager"]["seconds"] - result["lazy"]["seconds"]
+        result["saved_rss_mb"] = result["eager"]["max_rss_mb"] - result["lazy"]["max_rss_mb"]
+    print(json.dumps(result, indent=2))
+
+    if args.max_seconds is not None and result["lazy"]["seconds"] > args.max_seconds:
+        print(f"lazy import took {result['lazy']['seconds']:.2f}s > {args.max_seconds:.2f}s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Generate synthetic order data in the Auto Sales CSV schema.
+
+Rows are drawn in independently seeded chunks, so any size from a few
+thousand to tens of millions of rows is generated (and written) in
+bounded memory and is reproducible for a given seed. Distributions follow
+the real file: product-line, status and purchase-category mixes,
+quantity and price ranges, and cost levels.
+
+    python scripts/synthetic_data.py orders.csv --rows 1000000 --months 120
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dashboard.data import DATE_FORMAT  # noqa: E402
+
+COLUMNS = [
+    "ORDERNUMBER", "QUANTITYORDERED", "PRICEEACH", "ORDERLINENUMBER", "SALES", "ORDERDATE",
+    "DAYS_SINCE_LASTORDER", "STATUS", "PRODUCTLINE", "MSRP", "PRODUCTCODE", "CUSTOMERNAME", "CITY",
+    "COUNTRY", "CONTACTLASTNAME", "CONTACTFIRSTNAME", "DEALSIZE", "RAW_MATERIAL_COST",
+    "OPERATING_EXPENSES", "PURCHASE_CATEGORY",
+]
+PRODUCTLINES = {
+    "Classic Cars": 0.345, "Vintage Cars": 0.211, "Motorcycles": 0.114, "Planes": 0.111,
+    "Trucks and Buses": 0.107, "Ships": 0.084, "Trains": 0.028,
+}
+STATUSES = {
+    "Shipped": 0.925, "Cancelled": 0.022, "Resolved": 0.017, "On Hold": 0.016,
+    "In Process": 0.015, "Disputed": 0.005,
+}
+PURCHASE_CATEGORIES = ["Salaries", "Marketing", "Utilities", "Logistics", "Raw Materials"]
+COUNTRIES = ["USA", "Spain", "France", "Australia", "UK", "Italy", "Finland", "Norway", "Singapore", "Canada"]
+PRODUCTS_PER_LINE = 16
+LINES_PER_ORDER = 9
+CHUNK_ROWS = 1_000_000
+
+
+def _weighted(rng, choices: dict, size: int) -> np.ndarray:
+    p = np.array(list(choices.values()))
+    return rng.choice(len(choices), size=size, p=p / p.sum())
+
+
+def _catalog(seed: int):
+    """Product codes and their list prices, fixed per seed."""
+    rng = np.random.default_rng([seed, 0])
+    codes = np.array([f"S{line + 10}_{product + 1000}"
+                      for line in range(len(PRODUCTLINES)) for product in range(PRODUCTS_PER_LINE)])
+    msrp = rng.integers(33, 215, size=len(codes))
+    return codes, msrp
+
+
+def iter_orders(rows: int, months: int = 36, start: str = "2018-01", customers: int = 89,
+                seed: int = 0, chunk_rows: int = CHUNK_ROWS):
+    """Yield ``rows`` synthetic order lines over ``months`` months, in chunks.
+
+    ORDERDATE is formatted as in the source CSV, so chunks can be written
+    straight out with ``to_csv``.
+    """
+    codes, msrp = _catalog(seed)
+    first = pd.Period(start, "M")
+    month_starts = pd.period_range(first, periods=months, freq="M").to_timestamp()
+    # Every day a line can fall on (days 1-28 of each month), formatted once
+    days = (month_starts.values[:, None] + np.arange(28) * np.timedelta64(1, "D")).ravel()
+    day_labels = pd.DatetimeIndex(days).strftime(DATE_FORMAT).to_numpy()
+    days_to_end = ((days.max() - days) / np.timedelta64(1, "D")).astype("int64")
+    customer_names = np.array([f"Customer {i:04d} Ltd." for i in range(customers)])
+
+    for chunk, offset in enumerate(range(0, rows, chunk_rows)):
+        n = min(chunk_rows, rows - offset)
+        rng = np.random.default_rng([seed, chunk + 1])
+
+        day = np.sort(rng.integers(0, len(days), size=n))
+        line = _weighted(rng, PRODUCTLINES, n)
+        product = line * PRODUCTS_PER_LINE + rng.integers(0, PRODUCTS_PER_LINE, size=n)
+        price = np.round(msrp[product] * rng.uniform(0.8, 1.1, size=n), 2)
+        quantity = np.clip(np.rint(rng.normal(35, 9.8, size=n)), 6, 97).astype("int64")
+        sales = np.round(price * quantity, 2)
+        customer = rng.integers(0, customers, size=n)
+        order = offset + np.arange(n)
+
+        yield pd.DataFrame({
+            "ORDERNUMBER": 10100 + order // LINES_PER_ORDER,
+            "QUANTITYORDERED": quantity,
+            "PRICEEACH": price,
+            "ORDERLINENUMBER": order % LINES_PER_ORDER + 1,
+            "SALES": sales,
+            "ORDERDATE": day_labels[day],
+            "DAYS_SINCE_LASTORDER": days_to_end[day] + 42,
+            "STATUS": np.array(list(STATUSES))[_weighted(rng, STATUSES, n)],
+            "PRODUCTLINE": np.array(list(PRODUCTLINES))[line],
+            "MSRP": msrp[product],
+            "PRODUCTCODE": codes[product],
+            "CUSTOMERNAME": customer_names[customer],
+            "CITY": np.char.add("City ", (customer % 71).astype(str)),
+            "COUNTRY": np.array(COUNTRIES)[customer % len(COUNTRIES)],
+            "CONTACTLASTNAME": np.char.add("Contact", customer.astype(str)),
+            "CONTACTFIRSTNAME": "Alex",
+            "DEALSIZE": np.select([sales < 3000, sales < 7000], ["Small", "Medium"], "Large"),
+            "RAW_MATERIAL_COST": np.round(np.maximum(rng.normal(3040, 981, size=n), 500), 2),
+            "OPERATING_EXPENSES": np.round(np.maximum(rng.normal(1483, 498, size=n), 200), 2),
+            "PURCHASE_CATEGORY": np.array(PURCHASE_CATEGORIES)[rng.integers(0, len(PURCHASE_CATEGORIES), size=n)],
+        }, columns=COLUMNS)
+
+
+def generate_orders(rows: int, months: int = 36, **kwargs) -> pd.DataFrame:
+    """All ``rows`` synthetic order lines as one raw (unprepared) frame."""
+    return pd.concat(iter_orders(rows, months, **kwargs), ignore_index=True)
+
+
+def write_orders(path, rows: int, months: int = 36, **kwargs) -> Path:
+    """Write synthetic orders to a CSV (or ``.parquet``) file chunk by chunk."""
+    path = Path(path)
+    chunks = iter_orders(rows, months, **kwargs)
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                chunk["ORDERDATE"] = pd.to_datetime(chunk["ORDERDATE"], format=DATE_FORMAT)
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "w", newline="") as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, header=i == 0, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path, help="output file (.csv or .parquet)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--start", default="2018-01", help="first month (YYYY-MM)")
+    parser.add_argument("--customers", type=int, default=89)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    write_orders(args.out, args.rows, args.months, start=args.start, customers=args.customers, seed=args.seed)
+    print(f"{args.out}: {args.rows:,} rows over {args.months} months in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+# Keep test caches away from the real ones before dashboard is imported
+os.environ.setdefault("DASHBOARD_CACHE_DIR", tempfile.mkdtemp(prefix="dashboard-tests-"))
+
+from synthetic_data import write_orders  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def orders_csv(tmp_path_factory) -> Path:
+    """A small synthetic order CSV spanning two years."""
+    return write_orders(tmp_path_factory.mktemp("data") / "orders.csv", 3000, months=24, customers=12)
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from dashboard.backends import ChunkedBackend, DuckDBBackend, PandasBackend
+
+
+def assert_cubes_equal(cube: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(cube.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+@pytest.fixture(scope="module")
+def pandas_cube(orders_csv):
+    return PandasBackend(orders_csv).cube()
+
+
+def test_chunked_cube_matches_pandas(orders_csv, pandas_cube):
+    assert_cubes_equal(ChunkedBackend(orders_csv, chunk_rows=700).cube(), pandas_cube)
+
+
+def test_chunked_parquet_cube_matches_pandas(orders_csv, pandas_cube, tmp_path):
+    from synthetic_data import write_orders
+
+    parquet = write_orders(tmp_path / "orders.parquet", 3000, months=24, customers=12)
+    assert_cubes_equal(ChunkedBackend(parquet, chunk_rows=700).cube(), pandas_cube)
+
+
+def test_duckdb_cube_matches_pandas(orders_csv, pandas_cube):
+    pytest.importorskip("duckdb")
+    assert_cubes_equal(DuckDBBackend(orders_csv).cube(), pandas_cube)
+
+
+@pytest.fixture(scope="module")
+def sql_backend(orders_csv, tmp_path_factory):
+    from dashboard.backends import SqlBackend, load_sqlite
+
+    database = load_sqlite(orders_csv, tmp_path_factory.mktemp("sql") / "orders.sqlite", chunk_rows=700)
+    return SqlBackend(orders_csv, database=database)
+
+
+def test_sql_cube_matches_pandas(sql_backend, pandas_cube):
+    assert_cubes_equal(sql_backend.cube(), pandas_cube)
+
+
+def test_sql_queries_match_pandas(orders_csv, sql_backend, pandas_cube):
+    backend = PandasBackend(orders_csv)
+    months = sorted(pandas_cube["MONTH"].unique())[-3:]
+    pd.testing.assert_series_equal(sql_backend.monthly_revenue(), backend.monthly_revenue(), check_index_type=False)
+    pd.testing.assert_frame_equal(sql_backend.productline_sales(months).reset_index(),
+                                  backend.productline_sales(months).reset_index(),
+                                  check_dtype=False, check_categorical=False)
+    for by in ("PURCHASE_CATEGORY", "PRODUCTLINE"):
+        pd.testing.assert_frame_equal(sql_backend.category_burn(months, by), backend.category_burn(months, by),
+                                      check_dtype=False, check_categorical=False)
+    pd.testing.assert_series_equal(sql_backend.customer_sales("Classic Cars", months),
+                                   backend.customer_sales("Classic Cars", months),
+                                   check_dtype=False, check_categorical=False, check_index_type=False)
+
+
+def test_sql_rows_stream_in_chunks(sql_backend):
+    chunks = list(sql_backend.iter_orders(chunk_rows=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 1000]
+    assert pd.api.types.is_datetime64_any_dtype(chunks[0]["ORDERDATE"])
+
+
+def test_sql_results_are_reused_within_ttl(orders_csv, sql_backend):
+    from dashboard.backends import SqlBackend
+
+    query = "SELECT COUNT(*) AS N FROM orders"
+    assert sql_backend._query(query) is sql_backend._query(query)
+    expired = SqlBackend(orders_csv, database=sql_backend.database, ttl=0)
+    assert expired._query(query) is not expired._query(query)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.backtest import (
+    INTERVAL, MIN_TRAIN_MONTHS, fold_origins, linear_folds, quality, score,
+)
+
+
+def test_score_of_known_folds():
+    actuals = np.array([100.0, 200.0, 400.0, 50.0])
+    folds = [
+        (110.0, None, None),  # first fold of an empirical interval: not scored for coverage
+        (180.0, 150.0, 210.0),  # covers 200
+        (400.0, 390.0, 410.0),  # covers 400
+        (40.0, 30.0, 45.0),  # misses 50
+    ]
+    metrics = score(folds, actuals)
+    # |errors| / actuals: 10%, 10%, 0%, 20%
+    assert metrics["mape"] == pytest.approx(10.0)
+    assert metrics["rmse"] == pytest.approx(np.sqrt((10**2 + 20**2 + 0 + 10**2) / 4))
+    assert metrics["coverage"] == pytest.approx(2 / 3)
+    assert metrics["folds"] == 4
+
+
+def test_score_skips_zero_actuals_for_mape():
+    metrics = score([(5.0, None, None), (10.0, None, None)], np.array([0.0, 0.0]))
+    assert metrics["mape"] is None and metrics["coverage"] is None
+    assert metrics["rmse"] == pytest.approx(np.sqrt((25 + 100) / 2))
+
+
+def test_linear_folds_recover_an_exact_trend():
+    series = pd.Series(1000.0 + 25.0 * np.arange(24))
+    origins = fold_origins(len(series), 6)
+    folds = linear_folds(series, origins)
+    metrics = score(folds, series.to_numpy()[origins])
+    assert metrics["mape"] == pytest.approx(0.0, abs=1e-9)
+    assert metrics["folds"] == 6
+
+
+def test_quality_reports_the_lowest_mape_model():
+    result = {"metrics": [
+        {"series": "SALES", "model": "arima", "mape": 12.0, "coverage": INTERVAL - 0.2},
+        {"series": "SALES", "model": "linear", "mape": 8.0, "coverage": INTERVAL},
+        {"series": "SALES", "model": "lstm", "error": "TimeoutError"},
+        {"series": "NET_PROFIT", "model": "lstm", "mape": 1.0, "coverage": None},
+    ]}
+    assert quality(result) == {"model": "linear", "accuracy": 92.0, "coverage": INTERVAL, "confidence": "High"}
+    assert quality(result, "NET_PROFIT")["confidence"] == "Unknown"
+    assert quality(result, "CASH_BURN") is None
+
+
+@pytest.mark.parametrize("n_months", [0, 5, 12, 13, 15, 18, 19, 36])
+def test_every_fold_trains_on_at_least_a_year(n_months):
+    origins = fold_origins(n_months, folds=6)
+    assert all(MIN_TRAIN_MONTHS <= origin < n_months for origin in origins)
+    assert len(origins) == min(6, max(n_months - MIN_TRAIN_MONTHS, 0))
+    # The folds end at the latest month
+    if origins:
+        assert origins[-1] == n_months - 1
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.charts import MAX_POINTS, cash_burn_line, lttb
+
+
+def test_lttb_keeps_endpoints_and_threshold_points():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=5_000).cumsum()
+    keep = lttb(np.arange(len(y)), y, threshold=300)
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert (np.diff(keep) > 0).all()
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(2_000)
+    y[1_234] = 100.0
+    assert 1_234 in lttb(np.arange(len(y)), y, threshold=50)
+
+
+def test_short_series_are_not_downsampled():
+    y = np.arange(MAX_POINTS, dtype="float64")
+    np.testing.assert_array_equal(lttb(np.arange(len(y)), y), np.arange(MAX_POINTS))
+
+
+def test_cash_burn_line_downsamples_long_histories():
+    months = pd.period_range("1900-01", periods=MAX_POINTS + 100, freq="M")
+    monthly = [{"MONTH": month, "CASH_BURN": float(i % 7)} for i, month in enumerate(months)]
+    assert len(cash_burn_line(monthly, "Cash Burn").data[0].x) == MAX_POINTS
+    assert len(cash_burn_line(monthly[:MAX_POINTS], "Cash Burn").data[0].x) == MAX_POINTS
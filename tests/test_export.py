@@ -0,0 +1,21 @@
+import pandas as pd
+
+from dashboard.backends import ChunkedBackend
+from dashboard.data import read_orders_csv
+from dashboard.export import export_orders
+
+
+def test_parquet_export_from_multi_chunk_backend(orders_csv, tmp_path):
+    # Later chunks need wider integers than the first one
+    raw = pd.read_csv(orders_csv)
+    raw.loc[len(raw) // 2:, "ORDERNUMBER"] += 40_000
+    path = tmp_path / "orders.csv"
+    raw.to_csv(path, index=False)
+
+    backend = ChunkedBackend(path, chunk_rows=500)
+    exported = pd.read_parquet(export_orders(backend, "parquet"))
+
+    expected = read_orders_csv(path)
+    assert len(exported) == len(expected)
+    assert exported["ORDERNUMBER"].tolist() == expected["ORDERNUMBER"].tolist()
+    assert exported["QUANTITYORDERED"].sum() == expected["QUANTITYORDERED"].sum()
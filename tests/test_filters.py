@@ -0,0 +1,79 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.aggregates import build_monthly_cube
+from dashboard.data import read_orders_csv
+from dashboard.filters import FilterIndex, Filters
+
+
+@pytest.fixture(scope="module")
+def orders(orders_csv):
+    return read_orders_csv(orders_csv)
+
+
+def naive_mask(orders: pd.DataFrame, filters: Filters) -> np.ndarray:
+    mask = np.ones(len(orders), dtype=bool)
+    if filters.start is not None:
+        mask &= (orders["ORDERDATE"].dt.date >= filters.start).to_numpy()
+    if filters.end is not None:
+        mask &= (orders["ORDERDATE"].dt.date <= filters.end).to_numpy()
+    if filters.productlines:
+        mask &= orders["PRODUCTLINE"].astype(str).isin(filters.productlines).to_numpy()
+    if filters.customers:
+        mask &= orders["CUSTOMERNAME"].astype(str).isin(filters.customers).to_numpy()
+    if filters.categories:
+        mask &= orders["PURCHASE_CATEGORY"].astype(str).isin(filters.categories).to_numpy()
+    return mask
+
+
+def cases(orders: pd.DataFrame) -> list:
+    customers = sorted(orders["CUSTOMERNAME"].astype(str).unique())
+    return [
+        Filters(),
+        Filters(start=date(2018, 5, 10), end=date(2019, 2, 3)),
+        Filters(start=date(2018, 7, 1), end=date(2018, 7, 31)),
+        Filters(start=date(2019, 6, 1)),
+        Filters(end=date(2018, 3, 15)),
+        Filters(productlines=("Ships",)),
+        Filters(productlines=("Classic Cars", "Trains")),
+        Filters(customers=(customers[0],)),
+        Filters(customers=tuple(customers[2:5]), categories=("Marketing",)),
+        Filters(start=date(2018, 11, 1), end=date(2018, 12, 20), productlines=("Classic Cars", "Planes"),
+                customers=(customers[1],)),
+        Filters(productlines=("No Such Line",)),
+    ]
+
+
+def test_select_matches_boolean_mask(orders):
+    index = FilterIndex(orders, "ORDERDATE")
+    for filters in cases(orders):
+        np.testing.assert_array_equal(index.select(filters), np.flatnonzero(naive_mask(orders, filters)),
+                                      err_msg=repr(filters))
+
+
+def test_filtered_cube_matches_boolean_mask(orders):
+    index = FilterIndex(orders, "ORDERDATE")
+    for filters in cases(orders):
+        expected = build_monthly_cube(orders[naive_mask(orders, filters)])
+        pd.testing.assert_frame_equal(index.cube(filters).reset_index(drop=True), expected.reset_index(drop=True),
+                                      obj=repr(filters))
+
+
+def test_cube_index_selects_whole_months(orders):
+    cube = build_monthly_cube(orders)
+    index = FilterIndex(cube, "MONTH")
+    filters = Filters(start=date(2018, 7, 15), end=date(2018, 9, 2), productlines=("Motorcycles",))
+    selected = index.cube(filters)
+    expected = cube[cube["MONTH"].between(pd.Period("2018-07", "M"), pd.Period("2018-09", "M"))
+                    & (cube["PRODUCTLINE"] == "Motorcycles")]
+    pd.testing.assert_frame_equal(selected, expected.reset_index(drop=True))
+
+
+def test_filters_mask_matches_index(orders):
+    index = FilterIndex(orders, "ORDERDATE")
+    for filters in cases(orders):
+        np.testing.assert_array_equal(np.flatnonzero(filters.mask(orders).to_numpy()), index.select(filters),
+                                      err_msg=repr(filters))
@@ -0,0 +1,74 @@
+from dashboard.graph import Node
+
+
+def test_dependents_recompute_when_an_input_is_recomputed():
+    calls = {"source": 0, "table": 0}
+    failed = {"value": True}
+
+    def source(run):
+        calls["source"] += 1
+        return {"failed": failed["value"], "attempt": calls["source"]}
+
+    def table(test_source):
+        calls["table"] += 1
+        return test_source["attempt"]
+
+    source_node = Node("test_source", source, params=("run",), valid=lambda value: not value["failed"])
+    table_node = Node("test_table", table, inputs=[source_node])
+    params = {"run": object()}
+
+    assert table_node(params) == 1
+    # The source is invalid, so it is recomputed and the table follows it
+    failed["value"] = False
+    assert table_node(params) == 2
+    assert calls == {"source": 2, "table": 2}
+    # Both are now valid and served from the cache
+    assert table_node(params) == 2
+    assert calls == {"source": 2, "table": 2}
+
+
+def test_changed_parameter_only_invalidates_downstream():
+    calls = []
+    def downstream_fn(test_upstream, option):
+        calls.append("downstream")
+        return test_upstream, option
+
+    upstream = Node("test_upstream", lambda run: calls.append("upstream") or run, params=("run",))
+    downstream = Node("test_downstream", downstream_fn, inputs=[upstream], params=("option",))
+    run = object()
+
+    downstream({"run": run, "option": 1})
+    downstream({"run": run, "option": 2})
+    assert calls == ["upstream", "downstream", "downstream"]
+
+
+
+def test_failed_jobs_stay_cached_until_the_pool_breaks():
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    from dashboard.graph import _jobs_intact
+
+    submitted = []
+
+    def jobs(error):
+        future = Future()
+        if error in submitted:
+            future.set_result(1.0)
+        else:
+            future.set_exception(error)
+        submitted.append(error)
+        return [future]
+
+    node = Node("test_jobs", jobs, params=("error",), valid=_jobs_intact)
+    # A timed-out fit is final for this data: no resubmission on reruns
+    timeout = TimeoutError("fit took too long")
+    node({"error": timeout})
+    node({"error": timeout})
+    assert submitted == [timeout]
+    # A job lost with its pool is resubmitted, and the new result kept
+    broken = BrokenProcessPool("worker died")
+    node({"error": broken})
+    node({"error": broken})
+    node({"error": broken})
+    assert submitted == [timeout, broken, broken]
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from dashboard.aggregates import build_monthly_cube, load_monthly_cube
+from dashboard.data import data_version, delta_parts, load_orders, read_orders_csv
+from dashboard.ingest import ingest_orders
+
+
+@pytest.fixture
+def split_orders(orders_csv, tmp_path):
+    """The order CSV cut by month into a base file and two later deltas."""
+    raw = pd.read_csv(orders_csv)
+    months = pd.to_datetime(raw["ORDERDATE"], format="%d-%m-%Y").dt.to_period("M")
+    cuts = sorted(months.unique())[-6], sorted(months.unique())[-3]
+    paths = []
+    for name, rows in (("orders.csv", months < cuts[0]),
+                       ("delta-1.csv", (months >= cuts[0]) & (months < cuts[1])),
+                       ("delta-2.csv", months >= cuts[1])):
+        raw[rows].to_csv(tmp_path / name, index=False)
+        paths.append(tmp_path / name)
+    return paths
+
+
+def assert_cubes_equal(cube: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(cube.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_ingested_cube_matches_full_rebuild(orders_csv, split_orders):
+    base, *deltas = split_orders
+    load_monthly_cube(base)
+    for delta in deltas:
+        result = ingest_orders(delta, base)
+        assert result.rows == len(pd.read_csv(delta)) and not result.skipped
+
+    assert len(delta_parts(base)) == 2
+    assert_cubes_equal(load_monthly_cube(base), build_monthly_cube(read_orders_csv(orders_csv)))
+    assert len(load_orders(base)) == len(pd.read_csv(orders_csv))
+
+
+def test_revenue_arima_is_updated_not_refit(split_orders, tmp_path, monkeypatch):
+    pytest.importorskip("statsmodels")
+    from dashboard import registry
+    from dashboard.forecasting import get_forecaster
+
+    models = registry.ModelRegistry(tmp_path / "models")
+    monkeypatch.setattr(registry, "_default_registry", models)
+    base, *deltas = split_orders
+    stream = registry.stream_key("SALES", get_forecaster("arima").config())
+    ingest_orders(deltas[0], base)
+    assert models.head(stream)[1]["updates"] == 0
+    # The second delta only extends the series: its months are filtered
+    # through the previous fit
+    ingest_orders(deltas[1], base)
+    assert models.head(stream)[1]["updates"] == 1
+
+
+def test_resubmitting_a_delta_is_a_no_op(split_orders):
+    base, delta, _ = split_orders
+    ingest_orders(delta, base)
+    version, orders = data_version(base), len(load_orders(base))
+
+    with open(delta, "rb") as upload:
+        result = ingest_orders(upload, base)
+    assert result.skipped and result.rows == 0
+    assert len(delta_parts(base)) == 1
+    assert data_version(base) == version
+    assert len(load_orders(base)) == orders
+
+
+def test_replacing_the_csv_retires_the_deltas(split_orders):
+    base, delta, later = split_orders
+    ingest_orders(delta, base)
+    assert delta_parts(base)
+
+    # A new export of the full history replaces the file
+    pd.concat([pd.read_csv(base), pd.read_csv(delta), pd.read_csv(later)]).to_csv(base, index=False)
+    assert delta_parts(base) == ()
+    assert len(load_orders(base)) == len(pd.read_csv(base))
+    assert_cubes_equal(load_monthly_cube(base), build_monthly_cube(read_orders_csv(base)))
+
+
+
+def test_ingest_releases_the_previous_frame(split_orders):
+    import gc
+    import weakref
+
+    from dashboard.backends import PandasBackend
+    from dashboard.data import _load_with_deltas, source_version
+    from dashboard.filters import filter_index
+
+    base, delta, _ = split_orders
+    load_orders(base)
+    filter_index(PandasBackend(base))
+    # The process-wide frame every session shares
+    shared = weakref.ref(_load_with_deltas(str(base), source_version(base), delta_parts(base)))
+
+    ingest_orders(delta, base)
+    load_orders(base)
+    filter_index(PandasBackend(base))
+    gc.collect()
+    assert shared() is None
@@ -0,0 +1,52 @@
+import threading
+import tracemalloc
+
+from dashboard import metrics
+
+
+def test_session_spans_do_not_trace_memory(monkeypatch):
+    monkeypatch.setattr(metrics, "TRACE_MEMORY", False)
+    spans = metrics.record_session(True)
+    with metrics.span("block"):
+        assert not tracemalloc.is_tracing()
+    assert "peak_mb" not in spans[0]
+
+
+def test_nested_peaks(monkeypatch):
+    monkeypatch.setattr(metrics, "TRACE_MEMORY", True)
+    spans = metrics.record_session(True)
+    with metrics.span("outer"):
+        block = bytearray(20 * 2**20)
+        del block
+        with metrics.span("inner"):
+            block = bytearray(5 * 2**20)
+            del block
+    peaks = {record["span"]: record["peak_mb"] for record in spans}
+    assert 4.9 < peaks["inner"] < 6
+    # The inner span's reset does not hide the outer span's earlier peak
+    assert 19.9 < peaks["outer"] < 21
+    assert not tracemalloc.is_tracing()
+
+
+def test_spans_overlapping_another_thread_get_no_peak(monkeypatch):
+    monkeypatch.setattr(metrics, "TRACE_MEMORY", True)
+    entered, release = threading.Event(), threading.Event()
+    other = []
+
+    def viewer():
+        spans = metrics.record_session(True)
+        with metrics.span("other"):
+            entered.set()
+            release.wait()
+        other.extend(spans)
+
+    thread = threading.Thread(target=viewer)
+    thread.start()
+    entered.wait()
+    spans = metrics.record_session(True)
+    with metrics.span("this"):
+        pass
+    release.set()
+    thread.join()
+    assert "peak_mb" not in spans[0]
+    assert "peak_mb" not in other[0]
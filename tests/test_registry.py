@@ -0,0 +1,55 @@
+import os
+import time
+
+from dashboard import registry
+from dashboard.registry import ModelRegistry
+
+
+def write_blob(size: int):
+    return lambda directory: (directory / "model.bin").write_bytes(b"\0" * size)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    models = ModelRegistry(tmp_path, max_bytes=2_500)
+    for key in ("a", "b"):
+        models.put(key, {"forecast": key}, write_blob(1_000))
+    # Stored in order a, b, an hour ago
+    for age, key in ((3600, "a"), (3500, "b")):
+        past = time.time() - age
+        os.utime(models.entry_dir(key) / registry.META_FILE, (past, past))
+
+    # Reading a makes b the least recently used
+    assert models.get("a") == {"forecast": "a"}
+    models.put("c", {"forecast": "c"}, write_blob(1_000))
+    assert models.get("b") is None
+    assert models.get("a") == {"forecast": "a"}
+    assert models.get("c") == {"forecast": "c"}
+
+
+def test_put_same_key_twice(tmp_path):
+    models = ModelRegistry(tmp_path)
+    models.put("key", {"forecast": 1.0}, write_blob(10))
+    models.put("key", {"forecast": 2.0}, write_blob(10))
+    assert models.get("key") == {"forecast": 2.0}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["key"]
+
+
+def test_concurrent_put_of_same_key(tmp_path, monkeypatch):
+    # A second process (its own registry, so its own lock) stores the same
+    # key between this put's cleanup and its rename
+    ours, theirs = ModelRegistry(tmp_path), ModelRegistry(tmp_path)
+    replace = os.replace
+    raced = []
+
+    def racing_replace(source, target):
+        if not raced and "key" in str(target):
+            raced.append(True)
+            theirs.put("key", {"forecast": 1.0}, write_blob(10))
+        return replace(source, target)
+
+    monkeypatch.setattr(registry.os, "replace", racing_replace)
+    assert ours.put("key", {"forecast": 1.0}, write_blob(10)) == {"forecast": 1.0}
+    assert raced
+    assert ours.get("key") == {"forecast": 1.0}
+    # No staging directories are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["key"]
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.trends import linear_trend_forecast
+
+
+def test_closed_form_matches_per_group_regression():
+    LinearRegression = pytest.importorskip("sklearn.linear_model").LinearRegression
+
+    rng = np.random.default_rng(0)
+    months = {
+        "steady": pd.period_range("2019-01", "2020-12", freq="M"),
+        # Ends a year before the others
+        "early": pd.period_range("2018-06", "2019-11", freq="M"),
+        "gaps": pd.PeriodIndex(["2019-02", "2019-03", "2019-07", "2020-01", "2020-06"], freq="M"),
+        "single": pd.PeriodIndex(["2019-09"], freq="M"),
+    }
+    monthly = pd.concat(
+        [pd.DataFrame({"GROUP": name, "MONTH": index, "SALES": rng.normal(1000, 200, len(index))})
+         for name, index in months.items()],
+        ignore_index=True,
+    )
+
+    result = linear_trend_forecast(monthly, "GROUP", "SALES", steps=2).set_index("GROUP")
+    for name, index in months.items():
+        part = monthly[monthly["GROUP"] == name]
+        t = pd.PeriodIndex(part["MONTH"]).asi8.reshape(-1, 1)
+        target = np.array([[index.max().ordinal + 2]])
+        if len(part) == 1:
+            expected = part["SALES"].iloc[0]
+        else:
+            expected = LinearRegression().fit(t, part["SALES"]).predict(target)[0]
+        assert result.loc[name, "FORECAST"] == pytest.approx(expected, rel=1e-9), name
+        assert result.loc[name, "N_MONTHS"] == len(index)